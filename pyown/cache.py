@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+from array import array
+from hashlib import sha1
+from logging import getLogger
+from rdflib import Graph, __version__ as rdflib_version
+
+logger = getLogger("own")
+
+# bump whenever the snapshot layout changes
+SNAPSHOT_VERSION = 1
+
+
+def get_snapshot_key(filepaths:list):
+    """"""
+
+    # one entry by input file, in loading order
+    key = [SNAPSHOT_VERSION, rdflib_version]
+    for filepath in filepaths:
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        key.append((filepath, stat.st_size, stat.st_mtime_ns, _get_file_hash(filepath)))
+
+    return key
+
+
+def get_snapshot_path(filepaths:list, cache_dir:str, extension="pickle"):
+    """"""
+
+    # snapshot name depends only on the input paths
+    name = "\n".join(os.path.abspath(filepath) for filepath in filepaths)
+    name = sha1(name.encode()).hexdigest()
+    return os.path.join(cache_dir, f"{name}.{extension}")
+
+
+def load_snapshot(filepaths:list, cache_dir:str, store="default"):
+    """"""
+
+    snapshot_path = get_snapshot_path(filepaths, cache_dir)
+    snapshot = _read_snapshot(snapshot_path, filepaths)
+    if snapshot is None:
+        return None
+
+    # rebuilds graph, in the original parsing order
+    logger.info(f"loading data from snapshot '{snapshot_path}'")
+    graph = Graph(store=store)
+    for prefix, namespace in snapshot["namespaces"]:
+        graph.bind(prefix, namespace, override=False)
+    triples = decode_triples(snapshot["terms"], snapshot["triples"])
+    graph.addN((s, p, o, graph) for s, p, o in triples)
+
+    return graph
+
+
+def save_snapshot(triples:list, namespaces:list, filepaths:list, cache_dir:str):
+    """"""
+
+    terms, encoded = encode_triples(triples)
+    snapshot = {
+        "key": get_snapshot_key(filepaths),
+        "namespaces": namespaces,
+        "terms": terms,
+        "triples": encoded}
+
+    snapshot_path = get_snapshot_path(filepaths, cache_dir)
+    return _write_snapshot(snapshot, snapshot_path)
+
+
+def load_ili_snapshot(filepath:str, cache_dir:str):
+    """"""
+
+    snapshot_path = get_snapshot_path([filepath], cache_dir, "ili.pickle")
+    snapshot = _read_snapshot(snapshot_path, [filepath])
+    if snapshot is None:
+        return None
+
+    logger.info(f"loading ili map from snapshot '{snapshot_path}'")
+    return snapshot["ili_map"]
+
+
+def save_ili_snapshot(ili_map:dict, filepath:str, cache_dir:str):
+    """"""
+
+    snapshot = {
+        "key": get_snapshot_key([filepath]),
+        "ili_map": ili_map}
+
+    snapshot_path = get_snapshot_path([filepath], cache_dir, "ili.pickle")
+    return _write_snapshot(snapshot, snapshot_path)
+
+
+def encode_triples(triples:list):
+    """"""
+
+    # interns terms, so each one is pickled (and rebuilt) once
+    terms_ids = dict()
+    encoded = array("L")
+    for triple in triples:
+        for term in triple:
+            term_id = terms_ids.get(term)
+            if term_id is None:
+                term_id = terms_ids[term] = len(terms_ids)
+            encoded.append(term_id)
+
+    return list(terms_ids), encoded
+
+
+def decode_triples(terms:list, encoded:array):
+    """"""
+
+    encoded = iter(encoded)
+    for s, p, o in zip(encoded, encoded, encoded):
+        yield terms[s], terms[p], terms[o]
+
+
+def _read_snapshot(snapshot_path:str, filepaths:list):
+    if not os.path.isfile(snapshot_path):
+        return None
+
+    # reads snapshot
+    try:
+        with open(snapshot_path, "rb") as snapshot_file:
+            snapshot = pickle.load(snapshot_file)
+    except Exception as error:
+        logger.warning(f"could not read snapshot '{snapshot_path}': {error}")
+        os.remove(snapshot_path)
+        return None
+
+    # invalidates snapshot if any input changed
+    if snapshot.get("key") != get_snapshot_key(filepaths):
+        logger.info(f"snapshot '{snapshot_path}' is outdated, removing it")
+        os.remove(snapshot_path)
+        return None
+
+    return snapshot
+
+
+def _write_snapshot(snapshot:dict, snapshot_path:str):
+    # writes to a temporary file, so readers never see partial snapshots
+    os.makedirs(os.path.dirname(snapshot_path) or ".", exist_ok=True)
+    logger.info(f"saving snapshot to '{snapshot_path}'")
+    temporary_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as snapshot_file:
+        pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, snapshot_path)
+
+    return snapshot_path
+
+
+def _get_file_hash(filepath:str, block_size=1<<20):
+    file_hash = sha1()
+    with open(filepath, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+
+class Changeset():
+    """"""
+
+    def __init__(self):
+        # triples by insertion order
+        self.added = dict()
+        self.removed = dict()
+
+
+    def __len__(self):
+        return len(self.added) + len(self.removed)
+
+
+    def add(self, triple):
+        """"""
+        # adding back a removed triple undoes the removal
+        if triple in self.removed:
+            del self.removed[triple]
+        else:
+            self.added[triple] = None
+
+
+    def remove(self, triple):
+        """"""
+        # removing an added triple undoes the addition
+        if triple in self.added:
+            del self.added[triple]
+        else:
+            self.removed[triple] = None
+
+
+    def update(self, changeset):
+        """"""
+        for triple in changeset.removed:
+            self.remove(triple)
+        for triple in changeset.added:
+            self.add(triple)
+
+
+    def write(self, output_file):
+        """"""
+        # rdf patch rows, one n-triples statement each
+        for s, p, o in self.removed:
+            output_file.write(f"D {s.n3()} {p.n3()} {o.n3()} .\n")
+        for s, p, o in self.added:
+            output_file.write(f"A {s.n3()} {p.n3()} {o.n3()} .\n")
@@ -1,20 +1,25 @@
 # -*- coding: utf-8 -*-
 
 import sys
+import json
 import argparse
+from glob import glob
 import logging
 
 logger = logging.getLogger()
 
-from rdflib import Graph
-from pyown.util import get_format
-from pyown.lmf import LMF
-
 
 def _parse(args):
     filapaths = args.rdf
     ili_map_filapath = args.ili
     output_filepath = args.o
+    unmapped_filepath = args.unmapped
+    lexicons_filepath = args.lexicons
+    previous_lmf_filepath = args.previous_lmf
+    previous_filapaths = args.previous_rdf
+    cache_dir = args.cache
+    processes = args.processes
+    store = args.store
 
     # basic config
     label = args.lb
@@ -37,9 +42,19 @@ def _parse(args):
 
     logging.basicConfig(level=logging.DEBUG, handlers=[streamHandler,fileHandler])
 
+    # incremental formatting needs both previous files
+    if bool(previous_lmf_filepath) != bool(previous_filapaths):
+        parser.error("--previous-lmf and --previous-rdf must be given together")
+
     # calls main function
-    lmf_format(filapaths, ili_map_filapath, output_filepath, lexicon_id,  label,
-        version, lang, status, confidenceScore, url, email, license, citation)
+    if lexicons_filepath:
+        with open(lexicons_filepath) as lexicons_file:
+            lexicons = json.load(lexicons_file)
+        lmf_format_lexicons(lexicons, ili_map_filapath, cache_dir, processes, store)
+    else:
+        lmf_format(filapaths, ili_map_filapath, output_filepath, lexicon_id,  label,
+            version, lang, status, confidenceScore, url, email, license, citation, cache_dir, processes, store, unmapped_filepath,
+            previous_lmf_filepath, previous_filapaths)
 
 
 def lmf_format(
@@ -55,38 +70,97 @@ def lmf_format(
     url:str,
     email,
     license,
-    citation):
+    citation,
+    cache_dir=None,
+    processes=None,
+    store="default",
+    unmapped_filepath=None,
+    previous_lmf_filepath=None,
+    previous_filapaths=None):
+
+    # a single lexicon, same keys as the command line
+    lexicon = {
+        "rdf": filapaths, "o": output_filepath, "unmapped": unmapped_filepath,
+        "li": lexicon_id, "lb": label, "vr": version, "lg": lang, "status": status,
+        "cs": confidence_score, "url": url, "email": email, "licence": license, "citation": citation,
+        "previous_lmf": previous_lmf_filepath, "previous_rdf": previous_filapaths}
+    lmf_format_lexicons([lexicon], ili_map_filapath, cache_dir, processes, store)
+
+
+def lmf_format_lexicons(
+    lexicons:list,
+    ili_map_filapath:str,
+    cache_dir=None,
+    processes=None,
+    store="default"):
+    """"""
+
+    # deferred, so the command line starts fast
+    from pyown.util import load_ili_map, open_output
+    from pyown.lmf import write_lexical_resource
+
+    # one ili map for all lexicons
+    ili_map = load_ili_map(ili_map_filapath, cache_dir)
+
+    # lexicons sharing an output file go to the same lexical resource
+    outputs = dict()
+    for lexicon in lexicons:
+        outputs.setdefault(lexicon.get("o", "output.xml"), []).append(lexicon)
+
+    for output_filepath, output_lexicons in outputs.items():
+        logger.info(f"serialiing output to {output_filepath}")
+        with open_output(output_filepath) as output_file:
+            lmfs = _get_lmfs(output_lexicons, ili_map, cache_dir, processes, store)
+            write_lexical_resource(output_file, lmfs, processes)
+
+
+def _get_lmfs(lexicons, ili_map, cache_dir=None, processes=None, store="default"):
+    from pyown.util import load_graphs
+    from pyown.lmf import LMF
+
+    # loads each lexicon only when it is about to be written
+    for lexicon in lexicons:
+        rdf = load_graphs(_expand_filepaths(lexicon["rdf"]), cache_dir, processes, store)
+
+        logger.info(f"formatting '{lexicon.get('li')}' into LMF format")
+        lmf = LMF(rdf, ili_map, lexicon.get("li"), lexicon.get("lb"), lexicon.get("vr"),
+            lexicon.get("lg"), lexicon.get("status"), lexicon.get("cs"), lexicon.get("url"),
+            lexicon.get("email"), lexicon.get("licence"), lexicon.get("citation"))
+
+        # reuses the unchanged elements of a previous release
+        if lexicon.get("previous_lmf"):
+            logger.info(f"loading previous release of '{lexicon.get('li')}'")
+            previous_rdf = load_graphs(_expand_filepaths(lexicon["previous_rdf"]), cache_dir, processes, store)
+            lmf.use_previous(lexicon["previous_lmf"], previous_rdf)
 
-    # loading data
-    rdf = Graph()
-    for filapath in filapaths:
-        logger.info(f"loading data from file '{filapath}'")
-        format = get_format(filapath)
-        rdf.parse(filapath, format=format)
+        yield lmf
 
-    ili_map = Graph()
-    logger.info(f"loading data from file '{ili_map_filapath}'")
-    ili_map_format = get_format(ili_map_filapath)
-    ili_map.parse(ili_map_filapath, format=ili_map_format)
+        # reports synsets without ili, once the lexicon was written
+        unmapped_filepath = lexicon.get("unmapped")
+        if unmapped_filepath:
+            logger.info(f"reporting {len(lmf.unmapped_synsets)} synsets without ili to {unmapped_filepath}")
+            with open(unmapped_filepath, "w") as unmapped_file:
+                for synset in lmf.unmapped_synsets:
+                    unmapped_file.write(f"{synset}\n")
 
-    # formats into LMF format
-    logger.info(f"formatting into LMF format")
-    lmf = LMF(rdf, ili_map, lexicon_id, label, version, lang, status,
-            confidence_score, url, email, license, citation).format()
 
-    # serializes output
-    logger.info(f"serialiing output to {output_filepath}")
-    open(output_filepath, "w", encoding="utf8").write(lmf)
+def _expand_filepaths(patterns:list):
+    # glob patterns, as the shell would do
+    return [filepath for pattern in patterns for filepath in sorted(glob(pattern)) or [pattern]]
 
 
 # sets parser and interface function
 parser = argparse.ArgumentParser()
 
 # sets the user options
-parser.add_argument("rdf", help="rdf files", nargs="+")
+parser.add_argument("rdf", help="rdf files (ignored with --lexicons)", nargs="*")
 parser.add_argument("ili", help="rdf file from ili-map")
 
-parser.add_argument("-o", help="output file (default: output.xml)", default="output.xml")
+parser.add_argument("-o", help="output file, compressed if ending in .gz or .xz (default: output.xml)", default="output.xml")
+parser.add_argument("--lexicons", help="json file with a list of lexicons, each with the keys of the options here (rdf, o, li, lb, ...), rdf files may be glob patterns")
+parser.add_argument("--unmapped", help="output file listing synsets without ili (default: disabled)")
+parser.add_argument("--previous-lmf", help="output of a previous release, its unchanged elements are reused (requires --previous-rdf)")
+parser.add_argument("--previous-rdf", help="rdf files of the previous release", nargs="+")
 
 parser.add_argument("-li", help="lexicon_id")
 parser.add_argument("-lb", help="label")
@@ -98,9 +172,13 @@ parser.add_argument("--email", help="responsible")
 parser.add_argument("--status", help="project status")
 parser.add_argument("--licence", help="project licence")
 parser.add_argument("--citation", help="project citation")
+parser.add_argument("--cache", help="directory for parsed graph snapshots (default: disabled)")
+parser.add_argument("--processes", help="number of processes for loading files and formatting (default: all cores)", type=int)
+parser.add_argument("--store", help="graph store, 'compact' uses much less memory (default: 'default')", choices=["default", "compact"], default="default")
 
 
 parser.add_argument("-v", help="increase verbosity (example: -vv for debugging)", action="count", default=0)
 
 # cals the parser
-_parse(parser.parse_args())
\ No newline at end of file
+if __name__ == "__main__":
+    _parse(parser.parse_args())
@@ -7,16 +7,15 @@ import logging
 
 logger = logging.getLogger()
 
-from rdflib import Graph
-from pyown.util import get_format
-from pyown.split import Split
-
 
 def _parse(args):
     filapaths = args.rdf
     lang = args.l
     extension = args.e
     output_filepath = args.o
+    cache_dir = args.cache
+    processes = args.processes
+    store = args.store
 
     # configs logging
     streamHandler = logging.StreamHandler(stream=sys.stdout)
@@ -25,22 +24,25 @@ def _parse(args):
     logging.basicConfig(level=logging.DEBUG, handlers=[streamHandler])
 
     # calls main function
-    split_into_files(filapaths, lang, extension, output_filepath)
+    split_into_files(filapaths, lang, extension, output_filepath, cache_dir, processes, store)
 
 
 def split_into_files(
     filapaths:str, 
     lang:str,
     extension:str,
-    output_filepath:str):
+    output_filepath:str,
+    cache_dir=None,
+    processes=None,
+    store="default"):
+
+    # deferred, so the command line starts fast
+    from pyown.util import get_format, load_graphs
+    from pyown.split import Split
 
     # loading data
-    rdf = Graph()
-    for filapath in filapaths:
-        logger.info(f"loading data from file '{filapath}'")
-        format = get_format(filapath)
-        rdf.parse(filapath, format=format)
-      
+    rdf = load_graphs(filapaths, cache_dir, processes, store)
+
     # generates files
     os.makedirs(output_filepath, exist_ok=True)
 
@@ -71,8 +73,12 @@ parser.add_argument("rdf", help="rdf files", nargs="+")
 parser.add_argument("-l", help="wordnet language")
 parser.add_argument("-e", help="splitted extension (default: 'ttl')", default="ttl")
 parser.add_argument("-o", help="output filepath (default: 'output')", default="output")
+parser.add_argument("--cache", help="directory for parsed graph snapshots (default: disabled)")
+parser.add_argument("--processes", help="number of processes for loading files (default: all cores)", type=int)
+parser.add_argument("--store", help="graph store, 'compact' uses much less memory (default: 'default')", choices=["default", "compact"], default="default")
 
 parser.add_argument("-v", help="increase verbosity (example: -vv for debugging)", action="count", default=0)
 
 # cals the parser
-_parse(parser.parse_args())
\ No newline at end of file
+if __name__ == "__main__":
+    _parse(parser.parse_args())
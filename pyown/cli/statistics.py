@@ -3,19 +3,18 @@
 import sys
 import argparse
 import logging
-import tabulate
+from concurrent.futures import ProcessPoolExecutor
 
 logger = logging.getLogger()
 
-from rdflib import Graph
-from pyown.util import get_format
-from pyown.statistics import Statistics
-
 
 def _parse(args):
     ownpt_filapaths = args.ownpt
     ownen_filapaths = args.ownen
     output_filepath = args.o
+    cache_dir = args.cache
+    processes = args.processes
+    store = args.store
 
     # configs logging
     streamHandler = logging.StreamHandler(stream=sys.stdout)
@@ -24,49 +23,48 @@ def _parse(args):
     logging.basicConfig(level=logging.DEBUG, handlers=[streamHandler])
 
     # calls main function
-    statistics(ownpt_filapaths, ownen_filapaths, output_filepath)
+    statistics(ownpt_filapaths, ownen_filapaths, output_filepath, cache_dir, processes, store)
 
 
 def statistics(
     ownpt_filapaths,
     ownen_filapaths,
-    output_filepath):
-
-    # loading data
-    ownpt = Graph()
-    for filapath in ownpt_filapaths:
-        logger.info(f"loading data from file '{filapath}'")
-        format = get_format(filapath)
-        ownpt.parse(filapath, format=format)
-
-    ownen = Graph()
-    for filapath in ownen_filapaths:
-        logger.info(f"loading data from file '{filapath}'")
-        format = get_format(filapath)
-        ownen.parse(filapath, format=format)
-
-    # generates statistics
+    output_filepath,
+    cache_dir=None,
+    processes=None,
+    store="default"):
+
+    # deferred, so the command line starts fast
+    import tabulate
+
+    # loads and analyses each wordnet in its own process
+    if processes == 1:
+        statistics_pt = _get_statistics(ownpt_filapaths, "OWN-PT", cache_dir, processes, store)
+        statistics_en = _get_statistics(ownen_filapaths, "OWN-EN", cache_dir, processes, store)
+    else:
+        # shares the cores between both wordnets
+        processes = processes // 2 if processes else None
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            future_pt = executor.submit(_get_statistics, ownpt_filapaths, "OWN-PT", cache_dir, processes, store)
+            future_en = executor.submit(_get_statistics, ownen_filapaths, "OWN-EN", cache_dir, processes, store)
+            statistics_pt = future_pt.result()
+            statistics_en = future_en.result()
+
     ## pt
-    logger.info("generating statistics for OWN-PT")
-    statistics = Statistics(ownpt)
-    
-    polysemy_pt = statistics.get_polysemy("OWN-PT")
-    base_pt, core_pt = statistics.get_base_core("OWN-PT")
-    instantiated_synsets_pt = statistics.get_defined("OWN-PT")
-    multi_word_expressions_pt = statistics.get_multi_word_expressions("OWN-PT")
-    senses_pt, words_pt = statistics.get_summary("OWN-PT")
-    relations_pt = statistics.get_relations("OWN-PT")
+    polysemy_pt = statistics_pt["polysemy"]
+    base_pt, core_pt = statistics_pt["base_core"]
+    instantiated_synsets_pt = statistics_pt["defined"]
+    multi_word_expressions_pt = statistics_pt["multi_word_expressions"]
+    senses_pt, words_pt = statistics_pt["summary"]
+    relations_pt = statistics_pt["relations"]
 
     ## en
-    logger.info("generating statistics for OWN-EN")
-    statistics = Statistics(ownen)
-
-    polysemy_en = statistics.get_polysemy("OWN-EN")
-    base_en, core_en = statistics.get_base_core("OWN-EN")
-    instantiated_synsets_en = statistics.get_defined("OWN-EN")
-    multi_word_expressions_en = statistics.get_multi_word_expressions("OWN-EN")
-    senses_en, words_en = statistics.get_summary("OWN-EN")
-    relations_en = statistics.get_relations("OWN-EN")
+    polysemy_en = statistics_en["polysemy"]
+    base_en, core_en = statistics_en["base_core"]
+    instantiated_synsets_en = statistics_en["defined"]
+    multi_word_expressions_en = statistics_en["multi_word_expressions"]
+    senses_en, words_en = statistics_en["summary"]
+    relations_en = statistics_en["relations"]
 
     # serializes output
     logger.info(f"serializing output to '{output_filepath}'")
@@ -137,6 +135,17 @@ def statistics(
 
         outfile.write("\n")
 
+
+def _get_statistics(filepaths, prefix, cache_dir=None, processes=None, store="default"):
+    from pyown.util import load_graphs
+    from pyown.statistics import Statistics
+
+    # only the statistics go back to the parent process
+    graph = load_graphs(filepaths, cache_dir, processes, store)
+    logger.info(f"generating statistics for {prefix}")
+    return Statistics(graph).get_statistics(prefix)
+
+
 # sets parser and interface function
 parser = argparse.ArgumentParser()
 
@@ -144,8 +153,12 @@ parser = argparse.ArgumentParser()
 parser.add_argument("--ownpt", help="files from ownpt", nargs="+")
 parser.add_argument("--ownen", help="files from ownen", nargs="+")
 parser.add_argument("-o", help="output (default: statistics.org)", default="statistics.org")
+parser.add_argument("--cache", help="directory for parsed graph snapshots (default: disabled)")
+parser.add_argument("--processes", help="number of processes for loading files (default: all cores)", type=int)
+parser.add_argument("--store", help="graph store, 'compact' uses much less memory (default: 'default')", choices=["default", "compact"], default="default")
 
 parser.add_argument("-v", help="increase verbosity (example: -vv for debugging)", action="count", default=0)
 
 # cals the parser
-_parse(parser.parse_args())
\ No newline at end of file
+if __name__ == "__main__":
+    _parse(parser.parse_args())
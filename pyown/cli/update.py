@@ -6,13 +6,6 @@ import logging
 
 logger = logging.getLogger()
 
-from json import loads
-from rdflib import Graph
-from pyown.repair import Repair
-from pyown.update import Update
-from pyown.compare import Compare
-from pyown.util import get_format, get_unify_actions
-
 
 def _parse(args):
     filapaths = args.rdf
@@ -26,6 +19,13 @@ def _parse(args):
     output_filepath = args.o
     trashold_senior = args.ts
     trashold_junior = args.tj
+    cache_dir = args.cache
+    processes = args.processes
+    store = args.store
+    patch_filepath = args.patch
+    incremental = args.incremental
+    profile_filepath = args.profile
+    trace_memory = args.trace_memory
 
     # sets logging
     fileHandler = logging.FileHandler(filename="log-update", mode="w")
@@ -38,7 +38,8 @@ def _parse(args):
     # cals main function
     cli_update_own_from_dump(filapaths, wn_filepaths,
         suggestions_filepaths, votes_filepaths, output_filepath,
-        lang, users_senior, trashold_senior, trashold_junior)
+        lang, users_senior, trashold_senior, trashold_junior, cache_dir, processes, store, patch_filepath, incremental,
+        profile_filepath, trace_memory)
 
 
 def cli_update_own_from_dump(
@@ -50,50 +51,60 @@ def cli_update_own_from_dump(
     lang:str,
     users_senior=[],
     trashold_senior=1,
-    trashold_junior=2):
+    trashold_junior=2,
+    cache_dir=None,
+    processes=None,
+    store="default",
+    patch_filepath=None,
+    incremental=False,
+    profile_filepath=None,
+    trace_memory=False):
     """"""
 
+    # deferred, so the command line starts fast
+    from pyown.changeset import Changeset
+    from pyown.profiling import Profile
+    from pyown.repair import Repair
+    from pyown.update import Update, SUGGESTION_FIELDS, VOTE_FIELDS
+    from pyown.compare import Compare, DUMP_FIELDS
+    from pyown.util import get_format, get_unify_actions, load_graphs, read_jsonl
+
     # loading graph
-    rdf = Graph()
-    for filapath in filapaths:
-        logger.info(f"loading data from '{filapath}'")
-        format = get_format(filapath)
-        rdf.parse(filapath, format=format)
-
-    # loads the data
-    doc_wn = []
-    for wn_filepath in wn_filepaths:
-        logger.info(f"loading data from '{wn_filepath}'")
-        doc_wn += [loads(line) for line in open(wn_filepath).readlines()]
-    
-    doc_votes = []
-    for votes_filepath in votes_filepaths:
-        logger.info(f"loading data from '{votes_filepath}'")
-        doc_votes += [loads(line) for line in open(votes_filepath).readlines()]
+    rdf = load_graphs(filapaths, cache_dir, processes, store)
 
-    doc_suggestions = []
-    for suggestions_filepath in suggestions_filepaths:
-        logger.info(f"loading data from '{suggestions_filepath}'")
-        doc_suggestions += [loads(line) for line in open(suggestions_filepath).readlines()]
+    # records the changes, if reporting them
+    changeset = Changeset() if patch_filepath else None
+    # records the changed nodes, if repairing only around them
+    dirty_nodes = dict() if incremental else None
+    # measures each action, if reporting them
+    profile = Profile(trace_memory) if profile_filepath else None
+
+    # streams the data, keeping only fields in use
+    doc_wn = read_jsonl(wn_filepaths, DUMP_FIELDS)
+    doc_votes = read_jsonl(votes_filepaths, VOTE_FIELDS)
+    doc_suggestions = read_jsonl(suggestions_filepaths, SUGGESTION_FIELDS)
 
     # downgrades match given dump Wn
-    if doc_wn:
+    if wn_filepaths:
         logger.info(f"comparing wordnet to dump Wn")
-        report = Compare(rdf, doc_wn).compare_items()
+        report = Compare(rdf, doc_wn, profile).compare_items()
         actions = get_unify_actions(report)
     
         logger.info(f"applying actions from Comparing")
-        Update(rdf, lang).update_from_compare(actions)
+        Update(rdf, lang, changeset, dirty_nodes, profile).update_from_compare(actions)
 
     # updates given Suggesstions and Votes
-    if doc_votes and doc_suggestions:
+    if votes_filepaths and suggestions_filepaths:
         logger.info(f"applying actions from Suggestions")
-        Update(rdf, lang).update(doc_suggestions,
+        Update(rdf, lang, changeset, dirty_nodes, profile).update(doc_suggestions,
             doc_votes, users_senior, trashold_senior, trashold_junior)
     
     # validates and repaires resulting
-    repair = Repair(rdf, lang)
-    logger.info(f"applying repairing actions to Wordnet")
+    repair = Repair(rdf, lang, changeset, dirty_nodes, profile)
+    if incremental:
+        logger.info(f"applying repairing actions around {len(dirty_nodes)} changed nodes")
+    else:
+        logger.info(f"applying repairing actions to Wordnet")
     repair.repair_words()
     logger.info(f"granting well ordered Sense instances") 
     repair.sort_senses_instances()
@@ -103,6 +114,19 @@ def cli_update_own_from_dump(
     format = get_format(output_filepath)
     rdf.serialize(output_filepath, format=format)
 
+    # saves changes
+    if changeset is not None:
+        logger.info(f"writing {len(changeset)} changed triples to '{patch_filepath}'")
+        with open(patch_filepath, "w") as patch_file:
+            changeset.write(patch_file)
+
+    # saves measures
+    if profile is not None:
+        logger.info(f"profile of actions:\n{profile.get_table()}")
+        logger.info(f"writing profile of {len(profile.actions)} actions to '{profile_filepath}'")
+        with open(profile_filepath, "w") as profile_file:
+            profile.write_json(profile_file)
+
 
 # sets parser and interface function
 parser = argparse.ArgumentParser()
@@ -118,8 +142,16 @@ parser.add_argument("-u", help="list of senior/proficient users", nargs="*", def
 parser.add_argument("-ts", help="senior suggestion score trashold (default: 1)", default=1)
 parser.add_argument("-tj", help="junior suggestion score trashold (default: 2)", default=2)
 parser.add_argument("-o", help="output file (default: output.xml)", default="output.xml")
+parser.add_argument("--cache", help="directory for parsed graph snapshots (default: disabled)")
+parser.add_argument("--processes", help="number of processes for loading files (default: all cores)", type=int)
+parser.add_argument("--patch", help="output file with the triples added (A) and removed (D), as rdf patch rows (default: disabled)")
+parser.add_argument("--incremental", help="repairs only around the changed nodes, for already repaired rdf files (default: disabled)", action="store_true")
+parser.add_argument("--profile", help="output json file with the time, memory and triples of each action (default: disabled)")
+parser.add_argument("--trace-memory", help="traces allocations of each action in the profile, slowing it down", action="store_true")
+parser.add_argument("--store", help="graph store, 'compact' uses much less memory (default: 'default')", choices=["default", "compact"], default="default")
 
 parser.add_argument("-v", help="increase verbosity (example: -vv for debugging)", action="count", default=0)
 
 # cals the parser
-_parse(parser.parse_args())
\ No newline at end of file
+if __name__ == "__main__":
+    _parse(parser.parse_args())
@@ -3,11 +3,34 @@
 from tqdm import tqdm
 from rdflib import Graph, URIRef
 from pyown.own import OWN, SCHEMA
+from pyown.profiling import Profile
+
+# pointers in dump documents
+ANTONYM_POINTERS = {"wn30_pt_antonymOf":SCHEMA.antonymOf}
+# morphosemantic links
+MORPHO_POINTERS = {
+    "wn30_pt_property": SCHEMA.property,
+    "wn30_pt_result": SCHEMA.result,
+    "wn30_pt_state": SCHEMA.state,
+    "wn30_pt_undergoer": SCHEMA.undergoer,
+    "wn30_pt_uses": SCHEMA.uses,
+    "wn30_pt_vehicle": SCHEMA.vehicle,
+    "wn30_pt_event": SCHEMA.event,
+    "wn30_pt_instrument": SCHEMA.instrument,
+    "wn30_pt_location": SCHEMA.location,
+    "wn30_pt_material": SCHEMA.material,
+    "wn30_pt_agent": SCHEMA.agent,
+    "wn30_pt_bodyPart": SCHEMA.bodyPart,
+    "wn30_pt_byMeansOf": SCHEMA.byMeansOf
+}
+
+# dump fields read when comparing
+DUMP_FIELDS = ["doc_id", "word_pt", "gloss_pt", "example_pt", *ANTONYM_POINTERS, *MORPHO_POINTERS]
 
 class Compare(OWN):
     
-    def __init__(self, graph:Graph, dump:dict):
-        super().__init__(graph)
+    def __init__(self, graph:Graph, dump:dict, profile:Profile=None):
+        super().__init__(graph, profile=profile)
         self.dump = [doc["_source"] for doc in dump]
         self.docs = {synset["doc_id"]:synset for synset in self.dump}
 
@@ -55,27 +78,30 @@ class Compare(OWN):
 
         # start comparing
         self.logger.info(f"start comparing item {item_name}:")
-        for synset in tqdm(self.dump):
-            doc_id = synset['doc_id']
+        with self._measure(item_name) as measure:
+            for synset in tqdm(self.dump):
+                doc_id = synset['doc_id']
 
-            result, items, itemsd, itemso = self._compare_item(synset, item_name, query)
+                result, items, itemsd, itemso = self._compare_item(synset, item_name, query)
             
-            # update report
-            report["count"]["both"] += len(items)
-            report["count"]["dump"] += len(itemsd)
-            report["count"]["rdf"] += len(itemso)
+                # update report
+                report["count"]["both"] += len(items)
+                report["count"]["dump"] += len(itemsd)
+                report["count"]["rdf"] += len(itemso)
             
-            report["docs"][doc_id] = dict()
-            report["docs"][doc_id][item_name] = {"compare":result, "both":items, "dump":itemsd, "rdf":itemso}
-
-            # displays debug info
-            if not result:
-                compare = False
-                self.logger.debug(f"synset {doc_id}:words: comparing resulted False:"
-                                f"\n\t {item_name} {itemsd} found only in dump"
-                                f"\n\t {item_name} {itemso} found only in rdf"
-                                f"\n\t {item_name} {items} found in both documents")
+                report["docs"][doc_id] = dict()
+                report["docs"][doc_id][item_name] = {"compare":result, "both":items, "dump":itemsd, "rdf":itemso}
+
+                # displays debug info
+                if not result:
+                    compare = False
+                    self.logger.debug(f"synset {doc_id}:words: comparing resulted False:"
+                                    f"\n\t {item_name} {itemsd} found only in dump"
+                                    f"\n\t {item_name} {itemso} found only in rdf"
+                                    f"\n\t {item_name} {items} found in both documents")
         
+            measure["rows"] = len(self.dump)
+
         self.logger.info(f"{item_name}: comparing resulted '{compare}':"
                         f"\n\t {item_name}:{report['count']['dump']} found only in dump"
                         f"\n\t {item_name}:{report['count']['rdf']} found only in rdf"
@@ -88,31 +114,13 @@ class Compare(OWN):
     def compare_antonymof_own_dump(self):
         """"""
 
-        map_pointers = {"wn30_pt_antonymOf":SCHEMA.antonymOf}
-        return self._compare_pointers_own_dump(map_pointers)
+        return self._compare_pointers_own_dump(ANTONYM_POINTERS)
 
     
     def compare_morpho_own_dump(self):
         """"""
 
-        # morphosemantic links
-        pointers_uri_map = {  
-            "wn30_pt_property": SCHEMA.property,
-            "wn30_pt_result": SCHEMA.result,
-            "wn30_pt_state": SCHEMA.state,
-            "wn30_pt_undergoer": SCHEMA.undergoer,
-            "wn30_pt_uses": SCHEMA.uses,
-            "wn30_pt_vehicle": SCHEMA.vehicle,
-            "wn30_pt_event": SCHEMA.event,
-            "wn30_pt_instrument": SCHEMA.instrument,
-            "wn30_pt_location": SCHEMA.location,
-            "wn30_pt_material": SCHEMA.material,
-            "wn30_pt_agent": SCHEMA.agent,
-            "wn30_pt_bodyPart": SCHEMA.bodyPart,
-            "wn30_pt_byMeansOf": SCHEMA.byMeansOf
-        }
-
-        return self._compare_pointers_own_dump(pointers_uri_map)
+        return self._compare_pointers_own_dump(MORPHO_POINTERS)
 
 
     def _compare_pointers_own_dump(self, map_pointers:dict):
@@ -1,17 +1,24 @@
 # -*- coding: utf-8 -*-
 
+import os
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
-from lxml.etree import Element, tostring
-from pyown.own import Graph, OWN, OWL, SCHEMA, PWN30
+from lxml.etree import Element, tostring, indent, iterparse
+from pyown.own import Graph, OWN, SCHEMA
+from pyown.util import get_ili_map, open_input
+
+DOCTYPE = "<!DOCTYPE LexicalResource SYSTEM 'http://globalwordnet.github.io/schemas/WN-LMF-1.1.dtd'>"
+NAMESPACE = {"dc":"https://globalwordnet.github.io/schemas/dc/"}
 
 class LMF(OWN):
-    def __init__(self, own:Graph, ili_map:Graph, lexicon_id, label, version,
+    def __init__(self, own:Graph, ili_map:dict, lexicon_id, label, version,
         lang, status, confidenceScore, url, email, license, citation):
 
         super().__init__(own, lang)
-        self.ili = ili_map
-        self.ili.bind("owl", OWL)
-        self.namespace = {"dc":"https://globalwordnet.github.io/schemas/dc/"}
+        self.ili = ili_map if isinstance(ili_map, dict) else get_ili_map(ili_map)
+        self.unmapped_synsets = []
+        self.namespace = NAMESPACE
 
         # basic properties
         self.lexicon_id = lexicon_id
@@ -25,46 +32,170 @@ class LMF(OWN):
         self.license=license
         self.citation=citation
 
+        # lookup indexes, built once before formatting
+        self.synset_by_sense = None
+        self.members_by_synset = None
+        self.senses_by_word = None
+        self.relations_by_node = None
+        self.frames_by_synset = None
+
+        # previous release, for incremental formatting
+        self.previous_lmf_filepath = None
+        self.previous_graph = None
+
         
     def format(self,):
-        self.logger.info("start formating lexical resource")
+        output_file = BytesIO()
+        self.write(output_file)
+        return output_file.getvalue().decode()
 
-        lexical_resource = Element("LexicalResource", nsmap=self.namespace)
-        lexical_resource.append(self.get_lexicon_lmf())
 
-        return tostring(lexical_resource, encoding="UTF-8", pretty_print=True, xml_declaration=True,
-            doctype="<!DOCTYPE LexicalResource SYSTEM 'http://globalwordnet.github.io/schemas/WN-LMF-1.1.dtd'>").decode()
+    def write(self, output_file, processes=1):
+        """"""
+        write_lexical_resource(output_file, [self], processes)
+
+
+    def write_lexicon(self, output_file, processes=1):
+        """"""
+        self.logger.info(f"start formating lexicon '{self.lexicon_id}'")
+
+        # start tag of an empty lexicon
+        lexicon = self._get_lexicon_element()
+        lexicon.text = ""
+        start_tag, _ = tostring(lexicon, encoding="UTF-8").split(b"</Lexicon>")
+        output_file.write(b"\n  ")
+        output_file.write(start_tag)
+
+        # each element (or shard) is written as soon as it is formatted
+        _, lexicon = self._get_lexical_resource_element()
+        processes = processes or os.cpu_count() or 1
+        if self.previous_graph is not None:
+            for fragment in self.get_lexicon_fragments_incremental():
+                output_file.write(fragment)
+        elif processes == 1:
+            for element in self.get_lexicon_elements():
+                output_file.write(b"\n    ")
+                output_file.write(self._tostring_lmf(lexicon, element))
+        else:
+            for fragment in self.get_lexicon_fragments(processes):
+                output_file.write(fragment)
+
+        output_file.write(b"\n  </Lexicon>")
+
+        # reports synsets without ili
+        if self.unmapped_synsets:
+            self.logger.warning(f"{len(self.unmapped_synsets)} synsets without ili mapping, formatted with an empty ili")
 
 
     def get_lexicon_lmf(self):
         """"""
             
-        lexicon = Element("Lexicon", id=self.lexicon_id, label=self.label, status=self.status,
-            version=self.version, language=self.lang, confidenceScore=self.confidenceScore,
-            url=self.url, email=self.email, license=self.license, citation=self.citation)
+        lexicon = self._get_lexicon_element()
+        lexicon.extend(self.get_lexicon_elements())
+
+        return lexicon
+
+
+    def get_lexicon_elements(self):
+        """"""
+
+        self._build_lmf_indexes()
 
         # list of lexical entries (words) in your wordnet
         self.logger.info(f"formatting lexical entries (words)")
-        
-        words = self._get_all_words()
-        words_lmf = []
-        for word, in tqdm(words):
-            words_lmf.append(self.get_lexical_entry_lmf(word))
-        lexicon.extend(sorted(words_lmf, key = lambda x: x.attrib.items()))
+        yield from self.get_lexical_entries_lmf(tqdm(self._get_sorted_words()))
         
         # list of synsets in your wordnet
         self.logger.info(f"formatting synsets")
+        yield from self.get_synsets_lmf(tqdm(self._get_sorted_synsets()))
+
+
+    def get_lexicon_fragments(self, processes=None, shard_size=1000):
+        """"""
+
+        self._build_lmf_indexes()
+
+        # shards keep the sorted order of words, then synsets
+        words = self._get_sorted_words()
+        synsets = self._get_sorted_synsets()
+        shards = [("words", words[i:i+shard_size]) for i in range(0, len(words), shard_size)]
+        shards += [("synsets", synsets[i:i+shard_size]) for i in range(0, len(synsets), shard_size)]
+
+        self.logger.info(f"formatting {len(words)} lexical entries (words) and {len(synsets)} synsets in {len(shards)} shards")
+        with ProcessPoolExecutor(max_workers=processes, initializer=_set_worker_lmf, initargs=(self,)) as executor:
+            for fragment, unmapped_synsets in tqdm(executor.map(_format_shard, shards), total=len(shards)):
+                self.unmapped_synsets.extend(unmapped_synsets)
+                yield fragment
 
-        synsets = self._get_all_synsets()
-        synsets_lmf = []
-        for synset, in tqdm(synsets):
+
+    def use_previous(self, previous_lmf_filepath:str, previous_graph:Graph):
+        """"""
+        self.previous_lmf_filepath = previous_lmf_filepath
+        self.previous_graph = previous_graph
+
+
+    def get_lexicon_fragments_incremental(self):
+        """"""
+
+        self._build_lmf_indexes()
+        _, lexicon = self._get_lexical_resource_element()
+
+        # nodes whose elements must be formatted again
+        changed_nodes = self._get_changed_nodes()
+
+        words = self._get_sorted_words()
+        synsets = self._get_sorted_synsets()
+        self.logger.info(f"formatting lexicon from '{self.previous_lmf_filepath}', {len(changed_nodes)} nodes changed")
+
+        # walks the previous elements along the new ones, both sorted
+        previous_elements = self._get_previous_elements()
+        previous = next(previous_elements, None)
+        formatted = 0
+        for rank, nodes, get_id, get_elements in [
+                (0, words, self._get_word_id, self.get_lexical_entries_lmf),
+                (1, synsets, self._get_synset_id, self.get_synsets_lmf)]:
+            for node in nodes:
+                key = (rank, get_id(node))
+                # skips elements dropped since
+                while previous is not None and previous[0] < key:
+                    previous = next(previous_elements, None)
+
+                reuse = previous is not None and previous[0] == key and node not in changed_nodes
+                # ili map may have changed too
+                if reuse and rank == 1 and previous[1] != self._get_ili(node):
+                    reuse = False
+
+                if reuse:
+                    if previous[1] == "":
+                        self.unmapped_synsets.append(node)
+                    yield b"\n    " + previous[2]
+                else:
+                    for element in get_elements([node]):
+                        formatted += 1
+                        yield b"\n    " + self._tostring_lmf(lexicon, element)
+
+        self.logger.info(f"{formatted} elements formatted, the others reused")
+
+
+    def get_lexical_entries_lmf(self, words):
+        """"""
+
+        for word in words:
+            yield self.get_lexical_entry_lmf(word)
+
+
+    def get_synsets_lmf(self, synsets):
+        """"""
+
+        for synset in synsets:
             synset_lmf = self.get_synset_lmf(synset)
             # adds only if synset has members
             if not synset_lmf.get("members") == "":
-                synsets_lmf.append(synset_lmf)
-        lexicon.extend(sorted(synsets_lmf, key = lambda x: x.attrib.items()))
-
-        return lexicon
+                # reported at the end
+                if synset_lmf.get("ili") == "":
+                    self.logger.debug(f"no ili mapping for synset '{synset.n3()}'")
+                    self.unmapped_synsets.append(synset)
+                yield synset_lmf
 
 
     def get_synset_lmf(self, synset):
@@ -111,8 +242,7 @@ class LMF(OWN):
         part_of_speech = self.graph.value(word, SCHEMA.pos)
 
         # formatting lexical_entry
-        word_id = word.replace(self.WORD, "")
-        word_id = f"{self.lexicon_id}-word-{word_id}"
+        word_id = self._get_word_id(word)
         lexical_entry = Element("LexicalEntry", id=word_id)
         
         # formatting lemma
@@ -128,7 +258,7 @@ class LMF(OWN):
         lexical_entry.extend(sorted(forms_lmf, key = lambda x:x.get('writtenForm')))
 
         # list of senses for that lexical_entry (word)
-        senses = self.graph.subjects(SCHEMA.word, word)
+        senses = self._get_word_senses(word)
         senses_lmf = []
         for sense in senses:
             senses_lmf.append(self.get_sense_lmf(sense))
@@ -137,8 +267,10 @@ class LMF(OWN):
         # list of syntactic behaviours (frame) for that lexical_entry (word)
         behaviours = self.get_syntactic_behaviours(senses)
         behaviours_lmf = []
-        for behaviour in behaviours:
-            behaviour_lmf = Element("SyntacticBehaviour", subcategorizationFrame=behaviour.toPython())
+        for frame, frame_senses in behaviours.items():
+            # one behaviour by frame, shared by its senses
+            senses_ids = " ".join(sorted(self._get_node_id(sense) for sense in frame_senses))
+            behaviour_lmf = Element("SyntacticBehaviour", subcategorizationFrame=frame.toPython(), senses=senses_ids)
             behaviours_lmf.append(behaviour_lmf)
         lexical_entry.extend(sorted(behaviours_lmf, key = lambda x:x.get('subcategorizationFrame')))
 
@@ -151,7 +283,7 @@ class LMF(OWN):
 
         # sense_lmf
         sense_id = self._get_node_id(sense)
-        synset = self.graph.value(predicate=SCHEMA.containsWordSense, object=sense)
+        synset = self._get_sense_synset(sense)
         synset_id = self._get_synset_id(synset)
         sense_lmf = Element("Sense", id=sense_id, synset=synset_id)
         
@@ -178,25 +310,68 @@ class LMF(OWN):
 
 
     def get_syntactic_behaviours(self, senses):
-        behaviours = []
+        """"""
+        self._build_lmf_indexes()
+
+        # senses by frame of their synsets
+        behaviours = dict()
         for sense in senses:
-            synset = self.graph.value(predicate=SCHEMA.containsWordSense, object=sense)
-            behaviours.extend(list(self.graph.objects(synset, SCHEMA.frame)))
+            synset = self._get_sense_synset(sense)
+            for frame in self.frames_by_synset.get(synset, []):
+                behaviours.setdefault(frame, []).append(sense)
         return behaviours
 
 
     def get_synset_members(self, synset):
-        members = self.graph.objects(synset, SCHEMA.containsWordSense)
-        members_ids = [self._get_node_id(member) for member in members]
-        return " ".join(sorted(members_ids))
-    
+        self._build_lmf_indexes()
+        return self.members_by_synset.get(synset, "")
 
-    def get_node_relations(self, synset):
-        relations = []
+
+    def _get_sense_synset(self, sense):
+        self._build_lmf_indexes()
+        return self.synset_by_sense.get(sense)
+
+
+    def _get_word_senses(self, word):
+        self._build_lmf_indexes()
+        return self.senses_by_word.get(word, [])
+
+
+    def _build_lmf_indexes(self):
+        """"""
+        if self.synset_by_sense is not None:
+            return
+
+        self.logger.info(f"indexing synset members, word senses, frames and relations")
+
+        # sense to synset (first one, as graph.value) and synset members
+        self.synset_by_sense = dict()
+        members = dict()
+        for synset, _, sense in self.graph.triples((None, SCHEMA.containsWordSense, None)):
+            self.synset_by_sense.setdefault(sense, synset)
+            members.setdefault(synset, []).append(self._get_node_id(sense))
+        self.members_by_synset = {synset:" ".join(sorted(ids)) for synset, ids in members.items()}
+
+        # word to senses
+        self.senses_by_word = dict()
+        for sense, _, word in self.graph.triples((None, SCHEMA.word, None)):
+            self.senses_by_word.setdefault(word, []).append(sense)
+
+        # synset to frames
+        self.frames_by_synset = dict()
+        for synset, _, frame in self.graph.triples((None, SCHEMA.frame, None)):
+            self.frames_by_synset.setdefault(synset, []).append(frame)
+
+        # node to relations, by pointer
+        self.relations_by_node = dict()
         for pointer in self.pointers:
-            relations.extend(list(self.graph.triples((synset, pointer, None))))
+            for triple in self.graph.triples((None, pointer, None)):
+                self.relations_by_node.setdefault(triple[0], []).append(triple)
+    
 
-        return relations
+    def get_node_relations(self, synset):
+        self._build_lmf_indexes()
+        return self.relations_by_node.get(synset, [])
 
 
     def get_node_relation_lmf(self, item_name, relation, target):
@@ -210,6 +385,104 @@ class LMF(OWN):
             attrib={"{{{}}}type".format(self.namespace["dc"]):rel_name})
         
     
+    def _get_lexical_resource_element(self):
+        lexical_resource = Element("LexicalResource", nsmap=self.namespace)
+        lexicon = self._get_lexicon_element()
+        lexical_resource.append(lexicon)
+        return lexical_resource, lexicon
+
+
+    def _get_sorted_words(self):
+        return sorted(self._get_all_words(), key=self._get_word_id)
+
+
+    def _get_sorted_synsets(self):
+        return sorted(self._get_all_synsets(), key=self._get_synset_id)
+
+
+    def _get_changed_nodes(self):
+        """"""
+
+        graph = self.graph
+        previous_graph = self.previous_graph
+
+        # nodes of added or removed triples
+        changed_triples = set(graph) ^ set(previous_graph)
+        changed_nodes = set()
+        frame_synsets = set()
+        for s, p, o in changed_triples:
+            changed_nodes.add(s)
+            changed_nodes.add(o)
+            if p == SCHEMA.frame:
+                frame_synsets.add(s)
+
+        for some_graph in [graph, previous_graph]:
+            # senses are formatted inside their words, frames come from synsets
+            senses = set(changed_nodes)
+            for synset in frame_synsets:
+                senses.update(some_graph.objects(synset, SCHEMA.containsWordSense))
+            for sense in senses:
+                changed_nodes.update(some_graph.objects(sense, SCHEMA.word))
+
+            # relations are formatted only to synsets with members
+            for node in list(changed_nodes):
+                had_members = (node, SCHEMA.containsWordSense, None) in previous_graph
+                has_members = (node, SCHEMA.containsWordSense, None) in graph
+                if had_members != has_members:
+                    for pointer in self.pointers:
+                        changed_nodes.update(some_graph.subjects(pointer, node))
+
+        return changed_nodes
+
+
+    def _get_previous_elements(self):
+        """"""
+
+        # (rank, id) keys, as sorted when formatting
+        ranks = {"LexicalEntry":0, "Synset":1}
+        with open_input(self.previous_lmf_filepath) as previous_file:
+            for _, element in iterparse(previous_file, tag=list(ranks), huge_tree=True):
+                lexicon = element.getparent()
+                if lexicon.get("id") == self.lexicon_id:
+                    xml = tostring(element, encoding="UTF-8", with_tail=False)
+                    key = (ranks[element.tag], element.get("id"))
+                    yield key, element.get("ili"), self._drop_dc_declaration(xml)
+
+                # frees parsed elements
+                element.clear()
+                while element.getprevious() is not None:
+                    del lexicon[0]
+
+
+    def _get_lexicon_element(self):
+        return Element("Lexicon", id=self.lexicon_id, label=self.label, status=self.status,
+            version=self.version, language=self.lang, confidenceScore=self.confidenceScore,
+            url=self.url, email=self.email, license=self.license, citation=self.citation)
+
+
+    def _get_word_id(self, word):
+        word_id = word.replace(self.WORD, "")
+        return f"{self.lexicon_id}-word-{word_id}"
+
+
+    def _tostring_lmf(self, lexicon, element):
+        # inside the lexicon, so the dc prefix is the one from the root
+        lexicon.append(element)
+        indent(element, space="  ", level=2)
+        xml = tostring(element, encoding="UTF-8", with_tail=False)
+        lexicon.remove(element)
+
+        return self._drop_dc_declaration(xml)
+
+
+    def _drop_dc_declaration(self, xml:bytes):
+        # drops the dc declaration repeated in the first tag
+        declaration = f' xmlns:dc="{self.namespace["dc"]}"'.encode()
+        start_tag_end = xml.find(b">")
+        start_tag = xml[:start_tag_end].replace(declaration, b"", 1)
+        return start_tag + xml[start_tag_end:]
+
+
     def _get_text_element_lmf(self, element_name, text):
         element_lmf = Element(element_name)
         element_lmf.text = text
@@ -218,13 +491,7 @@ class LMF(OWN):
 
     def _get_ili(self, synset):
         synset_id = synset.split("synset-")[-1]
-        ili = self.ili.value(predicate=OWL.sameAs, object=PWN30[synset_id])
-        if ili is None:
-            # maybe historical parsing issues
-            synset_id = synset_id.replace("a", "s")
-            ili = self.ili.value(predicate=OWL.sameAs, object=PWN30[synset_id])
-
-        return ili.split("/")[-1]
+        return self.ili.get(synset_id, "")
 
 
     def sort_element(self, root):
@@ -240,3 +507,46 @@ class LMF(OWN):
 
     def _get_node_key(self, node):
         return "{}-{}".format(node.tag, node.attrib)
+
+
+def write_lexical_resource(output_file, lmfs, processes=1):
+    """"""
+
+    # header and footer around an (open) empty lexical resource
+    lexical_resource = Element("LexicalResource", nsmap=NAMESPACE)
+    lexical_resource.text = ""
+    xml = tostring(lexical_resource, encoding="UTF-8", pretty_print=True, xml_declaration=True, doctype=DOCTYPE)
+    header, footer = xml.split(b"</LexicalResource>")
+    output_file.write(header)
+
+    # lexicons are formatted (and may be loaded) one by one
+    for lmf in lmfs:
+        lmf.write_lexicon(output_file, processes)
+
+    output_file.write(b"\n</LexicalResource>")
+    output_file.write(footer)
+
+
+# formatter used by worker processes
+WORKER_LMF = None
+
+
+def _set_worker_lmf(lmf:LMF):
+    global WORKER_LMF
+    WORKER_LMF = lmf
+
+
+def _format_shard(shard:tuple):
+    kind, nodes = shard
+    lmf = WORKER_LMF
+    lmf.unmapped_synsets = []
+    _, lexicon = lmf._get_lexical_resource_element()
+
+    # elements as written by LMF.write
+    if kind == "words":
+        elements = lmf.get_lexical_entries_lmf(nodes)
+    else:
+        elements = lmf.get_synsets_lmf(nodes)
+    fragment = b"".join(b"\n    " + lmf._tostring_lmf(lexicon, element) for element in elements)
+
+    return fragment, lmf.unmapped_synsets
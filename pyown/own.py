@@ -2,10 +2,14 @@
 
 from re import sub
 from io import StringIO
-from logging import getLogger
-from lxml.etree import Element, DTD
-from html.entities import html5, entitydefs
-from rdflib import Graph, Namespace, Literal, SKOS, DC, RDF, RDFS, OWL
+from bisect import bisect_right
+from logging import getLogger, DEBUG
+from collections import Counter
+from types import MappingProxyType
+from contextlib import nullcontext
+from rdflib import Graph, Namespace, Literal, URIRef, SKOS, DC, RDF, RDFS, OWL
+from pyown.changeset import Changeset
+from pyown.profiling import Profile
 
 # global
 SCHEMA = Namespace("https://w3id.org/own/schema/")
@@ -14,9 +18,92 @@ PWN30 = Namespace("http://wordnet-rdf.princeton.edu/wn30/")
 INSTANCE_PT = Namespace("https://w3id.org/own/own-pt/instances/")
 INSTANCE_EN = Namespace("https://w3id.org/own/own-en/instances/")
 
+# pointers
+POINTERS = MappingProxyType({
+    SCHEMA.antonymOf:"antonym",
+    SCHEMA.seeAlso:"also",
+    SCHEMA.participleOf:"participle",
+    SCHEMA.adjectivePertainsTo:"pertainym",
+    SCHEMA.adverbPertainsTo:"derivation",
+    SCHEMA.derivationallyRelated:"derivation",
+    SCHEMA.classifiesByRegion:"has_domain_region",
+    SCHEMA.classifiedByRegion:"domain_region",
+    SCHEMA.classifiesByTopic:"has_domain_topic",
+    SCHEMA.classifiedByTopic:"domain_topic",
+    SCHEMA.classifiesByUsage:"is_exemplified_by",
+    SCHEMA.classifiedByUsage:"exemplifies",
+    SCHEMA.hypernymOf:"hypernym",
+    SCHEMA.hyponymOf:"hyponym",
+    SCHEMA.hasInstance:"instance_hypernym",
+    SCHEMA.instanceOf:"instance_hyponym",
+    SCHEMA.entails:"entails",
+    SCHEMA.causes:"causes",
+    SCHEMA.similarTo:"similar",
+    SCHEMA.attribute:"attribute",
+    SCHEMA.partHolonymOf:"holo_part",
+    SCHEMA.partMeronymOf:"mero_part",
+    SCHEMA.memberHolonymOf:"holo_member",
+    SCHEMA.memberMeronymOf:"mero_member",
+    SCHEMA.substanceHolonymOf:"holo_substance",
+    SCHEMA.substanceMeronymOf:"mero_substance",
+    SCHEMA.sameVerbGroupAs:"similar", # verb_group
+
+    SCHEMA.agent:"other", # "agent"
+    SCHEMA.bodyPart:"other", 
+    SCHEMA.byMeansOf:"other", 
+    SCHEMA.destination:"other", 
+    SCHEMA.event:"other", 
+    SCHEMA.instrument:"other", # "instrument"
+    SCHEMA.location:"other", # "location"
+    SCHEMA.material:"other", 
+    SCHEMA.property:"other", 
+    SCHEMA.result:"other", # "result"
+    SCHEMA.state:"other", 
+    SCHEMA.undergoer:"other", 
+    SCHEMA.uses:"other", 
+    SCHEMA.vehicle:"other",
+})
+
+# synset types
+SYNSET_TYPES = (
+    SCHEMA.Synset, 
+    SCHEMA.VerbSynset, 
+    SCHEMA.NounSynset,
+    SCHEMA.AdverbSynset, 
+    SCHEMA.AdjectiveSynset,
+    SCHEMA.AdjectiveSatelliteSynset)
+# sense types
+SENSE_TYPES = (
+    SCHEMA.WordSense, 
+    SCHEMA.NounWordSense, 
+    SCHEMA.VerbWordSense,
+    SCHEMA.AdverbWordSense,
+    SCHEMA.AdjectiveWordSense, 
+    SCHEMA.AdjectiveSatelliteWordSense)
+# indexed node types
+NODE_TYPES = (SCHEMA.Word, *SYNSET_TYPES, *SENSE_TYPES)
+
+# unicode mapping, built on first use
+UNICODE_ENTITY_NAMES = None
+
+# xml name characters, as ranges of code points (xml 1.0 fifth edition)
+NAME_START_CHAR_RANGES = [
+    (0x3A, 0x3A), (0x41, 0x5A), (0x5F, 0x5F), (0x61, 0x7A),
+    (0xC0, 0xD6), (0xD8, 0xF6), (0xF8, 0x2FF), (0x370, 0x37D),
+    (0x37F, 0x1FFF), (0x200C, 0x200D), (0x2070, 0x218F), (0x2C00, 0x2FEF),
+    (0x3001, 0xD7FF), (0xF900, 0xFDCF), (0xFDF0, 0xFFFD), (0x10000, 0xEFFFF)]
+NAME_CHAR_RANGES = sorted(NAME_START_CHAR_RANGES + [
+    (0x2D, 0x2E), (0x30, 0x39), (0xB7, 0xB7), (0x300, 0x36F), (0x203F, 0x2040)])
+
 
 class OWN():
-    def __init__(self, graph:Graph, lang="pt"):
+    # shared tables
+    pointers = POINTERS
+    synset_types = SYNSET_TYPES
+    sense_types = SENSE_TYPES
+    node_types = NODE_TYPES
+
+    def __init__(self, graph:Graph, lang="pt", changeset:Changeset=None, dirty_nodes:dict=None, profile:Profile=None):
         self.lang = lang
         self.graph = graph
         
@@ -46,100 +133,44 @@ class OWN():
         # statistics
         self.added_triples = 0
         self.removed_triples = 0
+        self.added_by_prefix = Counter()
+        self.removed_by_prefix = Counter()
 
-        # pointers
-        self.pointers = {
-            SCHEMA.antonymOf:"antonym",
-            SCHEMA.seeAlso:"also",
-            SCHEMA.participleOf:"participle",
-            SCHEMA.adjectivePertainsTo:"pertainym",
-            SCHEMA.adverbPertainsTo:"derivation",
-            SCHEMA.derivationallyRelated:"derivation",
-            SCHEMA.classifiesByRegion:"has_domain_region",
-            SCHEMA.classifiedByRegion:"domain_region",
-            SCHEMA.classifiesByTopic:"has_domain_topic",
-            SCHEMA.classifiedByTopic:"domain_topic",
-            SCHEMA.classifiesByUsage:"is_exemplified_by",
-            SCHEMA.classifiedByUsage:"exemplifies",
-            SCHEMA.hypernymOf:"hypernym",
-            SCHEMA.hyponymOf:"hyponym",
-            SCHEMA.hasInstance:"instance_hypernym",
-            SCHEMA.instanceOf:"instance_hyponym",
-            SCHEMA.entails:"entails",
-            SCHEMA.causes:"causes",
-            SCHEMA.similarTo:"similar",
-            SCHEMA.attribute:"attribute",
-            SCHEMA.partHolonymOf:"holo_part",
-            SCHEMA.partMeronymOf:"mero_part",
-            SCHEMA.memberHolonymOf:"holo_member",
-            SCHEMA.memberMeronymOf:"mero_member",
-            SCHEMA.substanceHolonymOf:"holo_substance",
-            SCHEMA.substanceMeronymOf:"mero_substance",
-            SCHEMA.sameVerbGroupAs:"similar", # verb_group
-
-            SCHEMA.agent:"other", # "agent"
-            SCHEMA.bodyPart:"other", 
-            SCHEMA.byMeansOf:"other", 
-            SCHEMA.destination:"other", 
-            SCHEMA.event:"other", 
-            SCHEMA.instrument:"other", # "instrument"
-            SCHEMA.location:"other", # "location"
-            SCHEMA.material:"other", 
-            SCHEMA.property:"other", 
-            SCHEMA.result:"other", # "result"
-            SCHEMA.state:"other", 
-            SCHEMA.undergoer:"other", 
-            SCHEMA.uses:"other", 
-            SCHEMA.vehicle:"other",
-        }
-
-        # unicode mapping
-        self.unicode_entity_names = dict()
-        for name in sorted(html5, reverse=True):
-            char = html5[name]
-            name = name.strip(";").strip("&")
-            self.unicode_entity_names[char] = name
-
-        # synset types
-        self.synset_types = [
-            SCHEMA.Synset, 
-            SCHEMA.VerbSynset, 
-            SCHEMA.NounSynset,
-            SCHEMA.AdverbSynset, 
-            SCHEMA.AdjectiveSynset,
-            SCHEMA.AdjectiveSatelliteSynset]
-        # sense types
-        self.sense_types = [
-            SCHEMA.WordSense, 
-            SCHEMA.NounWordSense, 
-            SCHEMA.VerbWordSense,
-            SCHEMA.AdverbWordSense,
-            SCHEMA.AdjectiveWordSense, 
-            SCHEMA.AdjectiveSatelliteWordSense]
+        # changes applied to graph, if recording
+        self.changeset = changeset
+        # changes not yet applied, while batching
+        self.batch = None
+        # subjects and objects of changes, by order, if tracking
+        self.dirty_nodes = dirty_nodes
+        # measures by action, if profiling
+        self.profile = profile
+
+        # typed node index, built on first use
+        self.nodes_by_type = None
+        self.types_by_node = None
+
+        # sense ids in use and lowest maybe free, by synset, seeded on first use
+        self.used_sense_ids = dict()
+        self.free_sense_ids = dict()
+
+        # escaped lemmas, by lemma
+        self.scaped_lemmas = dict()
 
         # logging
         self.logger = getLogger("own")
 
 
+    @property
+    def unicode_entity_names(self):
+        return get_unicode_entity_names()
+
+
     def _new_sense(self, synset, add_sense=False):
         """"""
-        # synset_id from uri
-        synset_id = synset.split("/")[-1]
-        synset_id = synset_id[synset_id.find("-")+1:]
 
-        # finds new sense_id 
-        sense_id = 1
-        while True:
-            # new sense to add
-            new_sense = self.WORDSENSE[f"{synset_id}-{sense_id}"]
-            new_triple = (synset, SCHEMA.containsWordSense, new_sense)
-
-            # validate new sense
-            if new_triple not in self.graph:
-                break
-            
-            # update counter
-            sense_id += 1
+        # lowest sense_id not in synset
+        sense_id = self._get_free_sense_id(synset)
+        new_sense = self._get_sense_uri(synset, sense_id)
 
         # connect sense
         if add_sense:
@@ -150,6 +181,72 @@ class OWN():
         return new_sense
 
 
+    def _get_free_sense_id(self, synset):
+        """"""
+        sense_ids = self._get_used_sense_ids(synset)
+
+        # resumes from last free, lowered when freeing
+        sense_id = self.free_sense_ids[synset]
+        while sense_id in sense_ids:
+            sense_id += 1
+        self.free_sense_ids[synset] = sense_id
+
+        return sense_id
+
+
+    def _get_used_sense_ids(self, synset):
+        """"""
+        sense_ids = self.used_sense_ids.get(synset)
+
+        # seeds from graph on first use
+        if sense_ids is None:
+            senses = self.graph.objects(synset, SCHEMA.containsWordSense)
+            sense_ids = {self._parse_sense_id(synset, sense) for sense in senses}
+            sense_ids.discard(None)
+            self.used_sense_ids[synset] = sense_ids
+            self.free_sense_ids[synset] = 1
+
+        return sense_ids
+
+
+    def _parse_sense_id(self, synset, sense):
+        """"""
+        # only uris as made by _get_sense_uri
+        if not isinstance(sense, URIRef):
+            return None
+        prefix = self._get_sense_uri(synset, "")
+        suffix = str(sense)[len(prefix):]
+        if not sense.startswith(prefix) or not suffix.isdecimal() or str(int(suffix)) != suffix:
+            return None
+        return int(suffix)
+
+
+    def _index_sense_id(self, triple, added:bool):
+        """"""
+        synset, p, sense = triple
+
+        # only synsets already seeded
+        if synset not in self.used_sense_ids or p != SCHEMA.containsWordSense:
+            return
+        sense_id = self._parse_sense_id(synset, sense)
+        if sense_id is None:
+            return
+
+        if added:
+            self.used_sense_ids[synset].add(sense_id)
+        else:
+            self.used_sense_ids[synset].discard(sense_id)
+            if sense_id < self.free_sense_ids[synset]:
+                self.free_sense_ids[synset] = sense_id
+
+
+    def _get_sense_uri(self, synset, sense_id):
+        # synset_id from uri
+        synset_id = synset.split("/")[-1]
+        synset_id = synset_id[synset_id.find("-")+1:]
+        return self.WORDSENSE[f"{synset_id}-{sense_id}"]
+
+
     def _get_sense(self, synset, lexical:str):
         """"""
 
@@ -219,7 +316,8 @@ class OWN():
     def _replace_node(self, old_node, new_node, prefix="replace"):
         """"""
 
-        self.logger.debug(f"{prefix}:replacing node '{old_node.n3()}' by '{new_node.n3()}'")
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug(f"{prefix}:replacing node '{old_node.n3()}' by '{new_node.n3()}'")
 
         # replaces objects
         result = self.graph.subject_predicates(old_node)
@@ -234,10 +332,30 @@ class OWN():
             self._add_triple((new_node,p,o), prefix)
 
 
+    def _replace_nodes(self, new_nodes:dict, prefix="replace"):
+        """"""
+
+        # drops all before adding, so replaced nodes may link each other
+        triples = []
+        for old_node, new_node in new_nodes.items():
+            if self.logger.isEnabledFor(DEBUG):
+                self.logger.debug(f"{prefix}:replacing node '{old_node.n3()}' by '{new_node.n3()}'")
+            for s, p, o in self.graph.triples((old_node, None, None)):
+                self._drop_triple((s, p, o), prefix)
+                triples.append((new_node, p, new_nodes.get(o, o)))
+            for s, p, o in self.graph.triples((None, None, old_node)):
+                self._drop_triple((s, p, o), prefix)
+                triples.append((new_nodes.get(s, s), p, new_node))
+
+        for triple in triples:
+            self._add_triple(triple, prefix)
+
+
     def _drop_node(self, node, prefix="drop_node"):
         """"""
         
-        self.logger.debug(f"{prefix}:dropping node '{node.n3()}'")
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug(f"{prefix}:dropping node '{node.n3()}'")
 
         for triple in self.graph.triples((node,None,None)):
             self._drop_triple(triple, prefix)
@@ -248,34 +366,108 @@ class OWN():
     def _add_triple(self, triple, prefix="add_triple"):
         s,p,o = triple
         
-        if triple not in self.graph:
-            self.logger.debug(f"{prefix}:adding triple: {s.n3()} {p.n3()} {o.n3()}")
-            self.graph.add(triple)
+        if not self._has_triple(triple):
+            if self.logger.isEnabledFor(DEBUG):
+                self.logger.debug(f"{prefix}:adding triple: {s.n3()} {p.n3()} {o.n3()}")
+            self._index_sense_id(triple, True)
+            self._mark_dirty(triple)
+            if self.batch is not None:
+                self.batch.add(triple)
+            else:
+                self.graph.add(triple)
+                self._index_triple(triple, True)
+                if self.changeset is not None:
+                    self.changeset.add(triple)
 
             # count triples added
             self.added_triples += 1
+            self.added_by_prefix[prefix] += 1
 
             return True
         
         # if not adding
-        self.logger.debug(f"{prefix}:triple already in graph: {s.n3()} {p.n3()} {o.n3()}")
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug(f"{prefix}:triple already in graph: {s.n3()} {p.n3()} {o.n3()}")
         return False
 
         
     def _drop_triple(self, triple, prefix="drop_triple"):
         s,p,o = triple
 
-        if triple in self.graph:
-            self.logger.debug(f"{prefix}:removing triple: {s.n3()} {p.n3()} {o.n3()}")
-            self.graph.remove(triple)
+        if self._has_triple(triple):
+            if self.logger.isEnabledFor(DEBUG):
+                self.logger.debug(f"{prefix}:removing triple: {s.n3()} {p.n3()} {o.n3()}")
+            self._index_sense_id(triple, False)
+            self._mark_dirty(triple)
+            if self.batch is not None:
+                self.batch.remove(triple)
+            else:
+                self.graph.remove(triple)
+                self._index_triple(triple, False)
+                if self.changeset is not None:
+                    self.changeset.remove(triple)
+
             # count triples removed
             self.removed_triples += 1
+            self.removed_by_prefix[prefix] += 1
             return True
         
         # if not removing
-        self.logger.debug(f"{prefix}:triple not in graph: {s.n3()} {p.n3()} {o.n3()}")
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug(f"{prefix}:triple not in graph: {s.n3()} {p.n3()} {o.n3()}")
         return False
 
+
+    def _measure(self, action:str):
+        """"""
+        if self.profile is None:
+            return nullcontext({"rows": 0})
+        return self.profile.measure(self, action)
+
+
+    def _mark_dirty(self, triple):
+        if self.dirty_nodes is not None:
+            s,_,o = triple
+            self.dirty_nodes[s] = None
+            self.dirty_nodes[o] = None
+
+
+    def _has_triple(self, triple):
+        # pending changes first, while batching
+        if self.batch is not None:
+            if triple in self.batch.added:
+                return True
+            if triple in self.batch.removed:
+                return False
+        return triple in self.graph
+
+
+    def _begin_batch(self):
+        """"""
+        # graph reads see the graph as before the batch,
+        # only _has_triple sees the pending changes
+        if self.batch is None:
+            self.batch = Changeset()
+
+
+    def _commit_batch(self):
+        """"""
+        batch, self.batch = self.batch, None
+        if not batch:
+            return
+
+        # bulk changes
+        self.graph.addN((s, p, o, self.graph) for s, p, o in batch.added)
+        for triple in batch.removed:
+            self.graph.remove(triple)
+
+        for triple in batch.added:
+            self._index_triple(triple, True)
+        for triple in batch.removed:
+            self._index_triple(triple, False)
+        if self.changeset is not None:
+            self.changeset.update(batch)
+
     
     def _copy_subject(self, old_node, new_node, prefix="copy_subject"):
         for predicate, object in self.graph.predicate_objects(old_node):
@@ -336,11 +528,76 @@ class OWN():
 
     
     def _get_all_words(self):
-        return self.graph.query("SELECT ?w WHERE { ?w a owns:Word }")
+        return self._get_nodes(SCHEMA.Word)
     
     
     def _get_all_synsets(self):
-        return self.graph.query("SELECT ?s WHERE { VALUES ?t { owns:Synset owns:AdjectiveSatelliteSynset owns:AdjectiveSynset owns:AdverbSynset owns:NounSynset owns:VerbSynset } ?s a ?t . }")
+        return self._get_nodes(*self.synset_types)
+
+
+    def _get_all_senses(self):
+        return self._get_nodes(*self.sense_types)
+
+
+    def _get_nodes(self, *node_types):
+        """"""
+        self._build_node_index()
+
+        # a node with many types is listed once
+        if len(node_types) == 1:
+            return list(self.nodes_by_type[node_types[0]])
+        nodes = dict()
+        for node_type in node_types:
+            nodes.update(self.nodes_by_type[node_type])
+        return list(nodes)
+
+
+    def _get_node_types(self, node):
+        """"""
+        self._build_node_index()
+        return self.types_by_node.get(node, set())
+
+
+    def _is_typed(self, node):
+        return (node, RDF.type, None) in self.graph
+
+
+    def _build_node_index(self):
+        """"""
+        if self.nodes_by_type is not None:
+            return
+
+        self.logger.debug(f"building typed node index")
+        self.nodes_by_type = {node_type:dict() for node_type in self.node_types}
+        self.types_by_node = dict()
+        for node_type, nodes in self.nodes_by_type.items():
+            for node in self.graph.subjects(RDF.type, node_type):
+                nodes[node] = None
+                self.types_by_node.setdefault(node, set()).add(node_type)
+
+
+    def _index_triple(self, triple, added=True):
+        """"""
+        s,p,o = triple
+
+        # only typing triples change the index
+        if self.nodes_by_type is None or p != RDF.type or o not in self.nodes_by_type:
+            return
+
+        if added:
+            self.nodes_by_type[o][s] = None
+            self.types_by_node.setdefault(s, set()).add(o)
+        else:
+            self.nodes_by_type[o].pop(s, None)
+            self.types_by_node.get(s, set()).discard(o)
+
+
+    def _invalidate_node_index(self):
+        """"""
+        self.nodes_by_type = None
+        self.types_by_node = None
+        self.used_sense_ids = dict()
+        self.free_sense_ids = dict()
         
     
     def _get_synset_by_id(self, synset_id):
@@ -351,7 +608,11 @@ class OWN():
 
     
     def _scape_lemma(self, lemma:str):
-        return "".join(self._scape_char(char) for char in lemma)
+        scaped_lemma = self.scaped_lemmas.get(lemma)
+        if scaped_lemma is None:
+            scaped_lemma = "".join(self._scape_char(char) for char in lemma)
+            self.scaped_lemmas[lemma] = scaped_lemma
+        return scaped_lemma
 
     
     def _scape_char(self, char:str):
@@ -363,14 +624,38 @@ class OWN():
 
 
     def _validate_dtd_start_char(self, char:str):
-        return self._validate_dtd_name(char)
+        return _in_ranges(char, NAME_START_CHAR_RANGES)
     
     def _validate_dtd_name_char(self, char:str):
-        return self._validate_dtd_name("id" + char)
+        return _in_ranges(char, NAME_CHAR_RANGES)
 
     def _validate_dtd_name(self, identifier:str):
+        from lxml.etree import Element, DTD
         dtd = "<!ELEMENT S EMPTY><!ATTLIST S id ID #REQUIRED>"
         dtd_file = StringIO(dtd)
         dtd_validator = DTD(dtd_file)
         sample_xml_element = Element("S", id = identifier)
         return dtd_validator.validate(sample_xml_element)
+
+
+def get_unicode_entity_names():
+    """"""
+    global UNICODE_ENTITY_NAMES
+
+    if UNICODE_ENTITY_NAMES is None:
+        from html.entities import html5
+        unicode_entity_names = dict()
+        for name in sorted(html5, reverse=True):
+            char = html5[name]
+            name = name.strip(";").strip("&")
+            unicode_entity_names[char] = name
+        UNICODE_ENTITY_NAMES = MappingProxyType(unicode_entity_names)
+
+    return UNICODE_ENTITY_NAMES
+
+
+def _in_ranges(char:str, ranges:list):
+    # range starting at or before the code point
+    code = ord(char)
+    i = bisect_right(ranges, (code, 0x10FFFF))
+    return i > 0 and ranges[i-1][0] <= code <= ranges[i-1][1]
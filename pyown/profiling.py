@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+import json
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter, process_time
+
+try:
+    from resource import getrusage, RUSAGE_SELF
+except ImportError:
+    getrusage = None
+
+# fields of each action, as reported
+PROFILE_FIELDS = ["stage", "action", "calls", "rows", "added", "removed", "wall", "cpu", "memory", "rss"]
+
+
+def _get_max_rss():
+    # peak resident memory, in KiB on linux
+    return getrusage(RUSAGE_SELF).ru_maxrss if getrusage else 0
+
+
+class Profile():
+    """"""
+
+    def __init__(self, trace_memory=False):
+        # measures by stage and action, by first run
+        self.actions = dict()
+
+        # allocations are traced only if asked, as tracing is slow
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+    @contextmanager
+    def measure(self, own, action:str):
+        """"""
+        stage = type(own).__name__
+        record = self.actions.get((stage, action))
+        if record is None:
+            record = dict.fromkeys(PROFILE_FIELDS, 0)
+            record.update(stage=stage, action=action)
+            self.actions[(stage, action)] = record
+
+        # the action sets rows, as returned by its query
+        measure = {"rows": 0}
+
+        added_triples = own.added_triples
+        removed_triples = own.removed_triples
+        max_rss = _get_max_rss()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory = tracemalloc.get_traced_memory()[0]
+        wall = perf_counter()
+        cpu = process_time()
+        try:
+            yield measure
+        finally:
+            record["wall"] += perf_counter() - wall
+            record["cpu"] += process_time() - cpu
+            if self.trace_memory:
+                # peak above the memory in use at start, in KiB
+                peak = (tracemalloc.get_traced_memory()[1] - memory) // 1024
+                record["memory"] = max(record["memory"], peak)
+            record["rss"] += _get_max_rss() - max_rss
+            record["calls"] += 1
+            record["rows"] += measure["rows"]
+            record["added"] += own.added_triples - added_triples
+            record["removed"] += own.removed_triples - removed_triples
+
+
+    def write_json(self, output_file):
+        """"""
+        json.dump(list(self.actions.values()), output_file, indent=2)
+
+
+    def get_table(self):
+        """"""
+        header = f"{'stage':<10} {'action':<30} {'calls':>7} {'rows':>8} {'added':>8} {'removed':>8} {'wall(s)':>9} {'cpu(s)':>9} {'mem(KiB)':>9} {'rss(KiB)':>9}"
+        lines = [header, "-" * len(header)]
+        for r in self.actions.values():
+            lines.append(
+                f"{r['stage']:<10} {r['action']:<30} {r['calls']:>7} {r['rows']:>8} {r['added']:>8} {r['removed']:>8} "
+                f"{r['wall']:>9.3f} {r['cpu']:>9.3f} {r['memory']:>9} {r['rss']:>9}")
+        return "\n".join(lines)
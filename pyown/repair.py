@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from tqdm import tqdm
+from collections import Counter
 from rdflib.graph import Graph, Literal, URIRef, BNode
 from rdflib.namespace import OWL, RDFS, RDF
 from pyown.own import OWN, SCHEMA
@@ -45,7 +46,9 @@ class Repair(OWN):
             before_added_triples = self.added_triples
             before_removed_triples = self.removed_triples
             # run action
-            action_cases = action(name)
+            with self._measure(name) as measure:
+                action_cases = action(name)
+                measure["rows"] = action_cases
             # computes added/removed after action
             after_added_triples = self.added_triples
             after_removed_triples = self.removed_triples
@@ -80,7 +83,9 @@ class Repair(OWN):
         # apply repairing actions
         for action in tqdm(actions):
             name = action.__name__
-            results = action(name)
+            with self._measure(name) as measure:
+                results = action(name)
+                measure["rows"] = results
             self.logger.debug(f"action '{name}' applied to {results} cases")
 
         # added and removed triples
@@ -89,29 +94,135 @@ class Repair(OWN):
                 f"\n\ttotal: {self.added_triples} triples added"
                 f"\n\ttotal: {self.removed_triples} triples removed")
 
-    def sort_senses_instances(self, name=""):
+    def _get_scope_nodes(self, node_type):
         """"""
-        count = 0
-        
-        for synset in tqdm(list(self.graph.subjects(SCHEMA.containsWordSense))):
-            # selecting senses
-            senses = self.graph.objects(synset, SCHEMA.containsWordSense)
-
-            # rename senses
-            labels = dict()
-            for sense in senses:
-                label = self.graph.value(sense, RDFS.label)
-                self.graph.remove((sense, SCHEMA.wordNumber, None))
-                # replaces sense name
-                blank_sense = BNode()
-                labels[label] = blank_sense
-                self._replace_node(sense, blank_sense)
-
-            # ordered senses
-            for label in sorted(labels):
-                old_sense = labels[label]
-                new_sense = self._new_sense(synset, True)
-                self._replace_node(old_sense, new_sense)
+        if self.dirty_nodes is None:
+            return self.graph.subjects(RDF.type, node_type)
+
+        # dirty nodes of type, as when the rule started
+        nodes = list(self.dirty_nodes)
+        return (node for node in nodes if (node, RDF.type, node_type) in self.graph)
+
+
+    def _get_scope_subject_objects(self, predicate):
+        """"""
+        if self.dirty_nodes is None:
+            return self.graph.subject_objects(predicate)
+
+        # all pairs sharing an object with a dirty subject, or with a dirty object
+        nodes = list(self.dirty_nodes)
+        objects = dict.fromkeys(o for node in nodes for o in self.graph.objects(node, predicate))
+        objects.update(dict.fromkeys(node for node in nodes if (None, predicate, node) in self.graph))
+        return ((s, o) for o in objects for s in self.graph.subjects(predicate, o))
+
+
+    def sort_senses_instances(self, name="sort_senses"):
+        """"""
+        with self._measure("sort_senses_instances") as measure:
+            measure["rows"] = self._sort_senses_instances(name)
+
+
+    def _sort_senses_instances(self, name):
+        """"""
+        synsets = [synset for synset, _ in self._get_scope_subject_objects(SCHEMA.containsWordSense)]
+
+        # new sense uris, for synsets renumbered up front
+        synset_ids = Counter(self._get_sense_uri(synset, "") for synset in dict.fromkeys(synsets))
+        renamed = dict()
+        numbers = dict()
+        sorted_synsets = set()
+        for synset in tqdm(dict.fromkeys(synsets)):
+            sense_numbers = self._get_sense_numbers(synset, synset_ids)
+            if sense_numbers is None:
+                continue
+            sorted_synsets.add(synset)
+            for sense, (new_sense, number) in sense_numbers.items():
+                numbers[new_sense] = number
+                if new_sense != sense:
+                    renamed[sense] = new_sense
+
+        # changes are applied in bulk, dropping before adding
+        self._begin_batch()
+        triples = []
+        for sense, new_sense in renamed.items():
+            for s, p, o in self.graph.triples((sense, None, None)):
+                self._drop_triple((s, p, o), name)
+                if p != SCHEMA.wordNumber:
+                    triples.append((new_sense, p, renamed.get(o, o)))
+            for s, p, o in self.graph.triples((None, None, sense)):
+                self._drop_triple((s, p, o), name)
+                triples.append((renamed.get(s, s), p, new_sense))
+        for new_sense, number in numbers.items():
+            if new_sense not in renamed:
+                for triple in self.graph.triples((new_sense, SCHEMA.wordNumber, None)):
+                    self._drop_triple(triple, name)
+            triples.append((new_sense, RDF.type, SCHEMA.WordSense))
+            triples.append((new_sense, SCHEMA.wordNumber, Literal(str(number))))
+        for triple in triples:
+            self._add_triple(triple, name)
+        self._commit_batch()
+
+        # other synsets are sorted one by one, as many times as listed
+        for synset in synsets:
+            if synset not in sorted_synsets:
+                self._sort_synset_senses(synset, name)
+
+        return len(synsets)
+
+
+    def _get_sense_numbers(self, synset, synset_ids:Counter):
+        """"""
+        senses = list(self.graph.objects(synset, SCHEMA.containsWordSense))
+        prefix = self._get_sense_uri(synset, "")
+
+        # only senses of this synset alone, under its uris, with distinct labels
+        if synset_ids[prefix] > 1:
+            return None
+        labels = dict()
+        for sense in senses:
+            if not isinstance(sense, BNode) and not (sense.startswith(prefix) and sense[len(prefix):].isdigit()):
+                return None
+            if len(list(self.graph.subjects(SCHEMA.containsWordSense, sense))) > 1:
+                return None
+            if len(list(self.graph.objects(sense, RDFS.label))) > 1:
+                return None
+            labels[self.graph.value(sense, RDFS.label)] = sense
+        if len(labels) < len(senses):
+            return None
+
+        # numbers follow the labels, new uris must be free
+        sense_numbers = dict()
+        for number, label in enumerate(sorted(labels), 1):
+            new_sense = self._get_sense_uri(synset, number)
+            if new_sense not in senses and (
+                (new_sense, None, None) in self.graph or (None, None, new_sense) in self.graph):
+                return None
+            sense_numbers[labels[label]] = (new_sense, number)
+
+        return sense_numbers
+
+
+    def _sort_synset_senses(self, synset, name="sort_senses"):
+        """"""
+        # selecting senses
+        senses = self.graph.objects(synset, SCHEMA.containsWordSense)
+
+        # rename senses
+        labels = dict()
+        for sense in senses:
+            label = self.graph.value(sense, RDFS.label)
+            for triple in list(self.graph.triples((sense, SCHEMA.wordNumber, None))):
+                self._drop_triple(triple, name)
+            # replaces sense name
+            blank_sense = BNode()
+            labels[label] = blank_sense
+            self._replace_node(sense, blank_sense, name)
+
+        # ordered senses
+        for label in sorted(labels):
+            old_sense = labels[label]
+            new_sense = self._new_sense(synset, True)
+            self._replace_node(old_sense, new_sense, name)
 
 
     def words_unique_pos(self):
@@ -122,41 +233,64 @@ class Repair(OWN):
 
         self.logger.info(f"start formatting Words to unique POS")
         words = self._get_all_words()
-        for word, in words:
+        word_set = set(words)
+
+        # senses and nomlex subjects by word, in one pass
+        word_senses = dict()
+        for sense, word in self.graph.subject_objects(SCHEMA.word):
+            if word in word_set:
+                word_senses.setdefault(word, []).append(sense)
+        word_nomlexes = dict()
+        for nomlex_pos, nomlex_pred in nomlex_map.items():
+            for subject, word in self.graph.subject_objects(nomlex_pred):
+                if word in word_set:
+                    word_nomlexes.setdefault(word, dict()).setdefault(nomlex_pos, []).append(subject)
+
+        # words linked to words or split into nodes in use change each other, so are split one by one
+        senses_pos = dict()
+        linked_words = set()
+        for word in words:
             count += 1
-            # accesses word POS
-            senses = list(self.graph.subjects(SCHEMA.word, word))
-            word_pos = set([self._get_pos(sense) for sense in senses])
-
-            # adds pos n or v if nomlex
-            for nomlex_pos, nomlex_pred in nomlex_map.items():
-                if (None, nomlex_pred, word) in self.graph:
-                    word_pos.add(nomlex_pos)
-
-            # splits word given its POS
+            for sense in word_senses.get(word, []):
+                senses_pos[sense] = self._get_pos(sense)
+            word_pos = {senses_pos[sense] for sense in word_senses.get(word, [])}
+            word_pos.update(word_nomlexes.get(word, dict()))
             for pos in word_pos:
+                new_word = URIRef(f"{word.toPython()}-{pos}")
+                if (new_word, None, None) in self.graph or (None, None, new_word) in self.graph:
+                    linked_words.add(word)
+                    if new_word in word_set:
+                        linked_words.add(new_word)
+            for node in self.graph.objects(word):
+                if node in word_set:
+                    linked_words.update((word, node))
+
+        # other words are split in bulk
+        word_predicate, pos_predicate = SCHEMA.word, SCHEMA.pos
+        self._begin_batch()
+        for word in words:
+            if word in linked_words:
+                continue
+            senses = word_senses.get(word, [])
+            nomlexes = word_nomlexes.get(word, dict())
+            predications = list(self.graph.predicate_objects(word))
+            for pos in {senses_pos[sense] for sense in senses} | nomlexes.keys():
                 self.logger.debug(f"format word '{word.n3()}' with pos '{pos}'")
                 new_word = URIRef(f"{word.toPython()}-{pos}")
-
-                # copy predications
-                self._copy_subject(word, new_word, "copy_word")
-
-                # replace suitable senses
-                senses_pos = [s for s in senses if self._get_pos(s) == pos]
-                for sense in senses_pos:
-                    self._add_triple((sense, SCHEMA.word, new_word), "copy_senses")
-
-                # copies nomlex predications
-                for nomlex_pos, nomlex_pred in nomlex_map.items():
-                    if nomlex_pos == pos:
-                        for subject in self.graph.subjects(nomlex_pred, word):
-                            self._add_triple((subject, nomlex_pred, new_word))
-
-                # add property pos
-                self._add_triple((new_word, SCHEMA.pos, Literal(pos)), "property_pos")
-
-            # after splitting drops old word
+                for predicate, object in predications:
+                    self._add_triple((new_word, predicate, object), "copy_word")
+                for sense in senses:
+                    if senses_pos[sense] == pos:
+                        self._add_triple((sense, word_predicate, new_word), "copy_senses")
+                for subject in nomlexes.get(pos, []):
+                    self._add_triple((subject, nomlex_map[pos], new_word))
+                self._add_triple((new_word, pos_predicate, Literal(pos)), "property_pos")
             self._drop_node(word, "drop_word")
+        self._commit_batch()
+
+        for word in words:
+            if word in linked_words:
+                self._split_word_pos(word, nomlex_map)
 
         # resulting added and removed triples
         self.logger.info(
@@ -165,6 +299,43 @@ class Repair(OWN):
                 f"\n\ttotal: {self.removed_triples} triples removed")
 
 
+    def _split_word_pos(self, word, nomlex_map:dict):
+        """"""
+        # accesses word POS
+        senses = list(self.graph.subjects(SCHEMA.word, word))
+        word_pos = set([self._get_pos(sense) for sense in senses])
+
+        # adds pos n or v if nomlex
+        for nomlex_pos, nomlex_pred in nomlex_map.items():
+            if (None, nomlex_pred, word) in self.graph:
+                word_pos.add(nomlex_pos)
+
+        # splits word given its POS
+        for pos in word_pos:
+            self.logger.debug(f"format word '{word.n3()}' with pos '{pos}'")
+            new_word = URIRef(f"{word.toPython()}-{pos}")
+
+            # copy predications
+            self._copy_subject(word, new_word, "copy_word")
+
+            # replace suitable senses
+            senses_pos = [s for s in senses if self._get_pos(s) == pos]
+            for sense in senses_pos:
+                self._add_triple((sense, SCHEMA.word, new_word), "copy_senses")
+
+            # copies nomlex predications
+            for nomlex_pos, nomlex_pred in nomlex_map.items():
+                if nomlex_pos == pos:
+                    for subject in self.graph.subjects(nomlex_pred, word):
+                        self._add_triple((subject, nomlex_pred, new_word))
+
+            # add property pos
+            self._add_triple((new_word, SCHEMA.pos, Literal(pos)), "property_pos")
+
+        # after splitting drops old word
+        self._drop_node(word, "drop_word")
+
+
     def format_synset_id(self):
         """"""
 
@@ -172,7 +343,7 @@ class Repair(OWN):
 
         self.logger.info(f"start formatting property synsetId")
         synsets = self._get_all_synsets()
-        for synset, in synsets:
+        for synset in synsets:
             count += 1
             
             # removes old property
@@ -199,7 +370,7 @@ class Repair(OWN):
         count = 0
 
         self.logger.info(f"start formatting AdjectiveSatelliteSynset")
-        satellite_synsets = self.graph.subjects(RDF.type, SCHEMA.AdjectiveSatelliteSynset)
+        satellite_synsets = self._get_nodes(SCHEMA.AdjectiveSatelliteSynset)
         for synset in satellite_synsets:
             if synset.endswith("-a"):
                 count += 1
@@ -322,8 +493,7 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?s ?p ?o WHERE { VALUES ?p { owns:lemma } ?s ?p ?o . }"
-        result = self.graph.query(query)
+        result = list(self.graph.triples((None, SCHEMA.lemma, None)))
 
         for triple in result:
             count += 1
@@ -337,10 +507,9 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?s WHERE { VALUES ?t { owns:Synset owns:AdjectiveSatelliteSynset owns:AdjectiveSynset owns:AdverbSynset owns:NounSynset owns:VerbSynset } ?s a ?t . }"
-        result = self.graph.query(query)
+        result = self._get_all_synsets()
 
-        for synset, in result:
+        for synset in result:
             synset_id = synset.split("/synset-")[-1].split("-")[0]
             new_synset_id = Literal(synset_id)
             old_synset_id = self.graph.value(synset, SCHEMA.synsetId)
@@ -358,10 +527,17 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?s2 WHERE { VALUES ?p { owns:adverbPertainsTo owns:derivationallyRelated owns:classifiesByUsage owns:classifiesByTopic owns:classifiesByRegion } ?s1 ?p ?s2 . ?s1 a owns:WordSense . FILTER NOT EXISTS { ?s2 a ?t . } }"
-        result = self.graph.query(query)
-
-        for sense, in result:
+        # senses pointing to untyped nodes
+        pointers = [
+            SCHEMA.adverbPertainsTo, SCHEMA.derivationallyRelated, SCHEMA.classifiesByUsage,
+            SCHEMA.classifiesByTopic, SCHEMA.classifiesByRegion]
+        result = [
+            sense for pointer in pointers
+                for source, sense in self.graph.subject_objects(pointer)
+                    if SCHEMA.WordSense in self._get_node_types(source)
+                        and not self._is_typed(sense)]
+
+        for sense in result:
             new_sense = URIRef(sense.replace("-a-", "-s-"))
             if sense == new_sense:
                 continue
@@ -379,8 +555,11 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?w ?l ?p WHERE { ?w rdf:type owns:Word . ?w owns:lemma ?l . ?w owns:pos ?p }"
-        result = self.graph.query(query)
+        # matched lazily, so later rows see earlier replacements
+        result = (
+            (word, lexical, pos) for word in self._get_scope_nodes(SCHEMA.Word)
+                for lexical in self.graph.objects(word, SCHEMA.lemma)
+                    for pos in self.graph.objects(word, SCHEMA.pos))
         
         for word, lexical, pos in result:
             new_word = self._new_word(lexical, True, pos)
@@ -396,10 +575,11 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?w WHERE{ ?w rdf:type owns:Word . FILTER NOT EXISTS { ?s ?p ?w . } } "
-        result = self.graph.query(query)
+        result = (
+            word for word in self._get_scope_nodes(SCHEMA.Word)
+                if (None, None, word) not in self.graph)
         
-        for word, in result:
+        for word in result:
             count += 1
             self._drop_node(word, name)
 
@@ -411,10 +591,11 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?s WHERE{ ?s rdf:type owns:WordSense . FILTER NOT EXISTS { ?ss owns:containsWordSense ?s . } } "
-        result = self.graph.query(query)
+        result = (
+            sense for sense in self._get_scope_nodes(SCHEMA.WordSense)
+                if (None, SCHEMA.containsWordSense, sense) not in self.graph)
         
-        for sense, in result:
+        for sense in result:
             count += 1
             self._drop_node(sense, name)
 
@@ -426,12 +607,23 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?s2 WHERE{ ?ss owns:containsWordSense ?s1; owns:containsWordSense ?s2 . ?s1 rdfs:label ?l . ?s2 rdfs:label ?l . FILTER ( STR(?s1) < STR(?s2) ) }"
-        result = self.graph.query(query)
-        
-        for sense2, in result:
+        # senses by synset and label
+        groups = dict()
+        for sense, label in self._get_scope_subject_objects(RDFS.label):
+            for synset in self.graph.subjects(SCHEMA.containsWordSense, sense):
+                groups.setdefault((synset, label), []).append(sense)
+
+        # all but the lesser sense of each group
+        result = dict.fromkeys(
+            sense for senses in groups.values() if len(senses) > 1
+                for sense in sorted(senses, key=str)[1:])
+
+        # changes are applied in bulk
+        self._begin_batch()
+        for sense in result:
             count += 1
-            self._drop_node(sense2, name)
+            self._drop_node(sense, name)
+        self._commit_batch()
 
         # how many actions
         return count
@@ -441,26 +633,59 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?w1 ?w2 WHERE{ ?w1 owns:lemma ?l . ?w2 owns:lemma ?l . ?w1 owns:pos ?p . ?w2 owns:pos ?p . FILTER ( STR(?w1) < STR(?w2) )}"
-        result = self.graph.query(query)
-        for word1, word2 in result:
-            count += 1
-            self._replace_node(word2, word1, name)
+        # words by lemma and pos
+        groups = dict()
+        for word, lemma in self._get_scope_subject_objects(SCHEMA.lemma):
+            for pos in self.graph.objects(word, SCHEMA.pos):
+                groups.setdefault((lemma, pos), []).append(word)
+
+        # words sharing a group are merged into the lesser one
+        new_words = self._get_lesser_nodes(groups.values())
+
+        # changes are applied in bulk
+        self._begin_batch()
+        count += len(new_words)
+        self._replace_nodes(new_words, name)
+        self._commit_batch()
 
         # how many actions
         return count
 
 
+    def _get_lesser_nodes(self, groups):
+        """"""
+        lesser = dict()
+
+        def find(node):
+            while lesser.get(node, node) != node:
+                node = lesser[node]
+            return node
+
+        # overlapping groups are joined under their lesser node
+        for nodes in groups:
+            if len(nodes) > 1:
+                roots = {find(node) for node in nodes}
+                root = min(roots, key=str)
+                for node in roots:
+                    lesser[node] = root
+
+        return {node: find(node) for node in lesser if find(node) != node}
+
+
     def remove_double_words(self, name=""):
         """"""
         count = 0
         
-        query = "SELECT ?w WHERE{ ?w owns:lemma ?l1 . ?w owns:lemma ?l2 . FILTER ( ?l1 != ?l2 ) }"
-        result = self.graph.query(query)
+        # words by number of lemmas
+        lemmas = Counter(word for word, _ in self._get_scope_subject_objects(SCHEMA.lemma))
+        result = [word for word, lemmas_count in lemmas.items() if lemmas_count > 1]
 
-        for word, in result:
+        # changes are applied in bulk
+        self._begin_batch()
+        for word in result:
             count += 1
             self._drop_node(word, name)
+        self._commit_batch()
 
         # how many actions
         return count
@@ -470,9 +695,11 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?s ?p ?o WHERE{ VALUES ?p { rdfs:label owns:lemma owns:gloss owns:example owns:lemma } ?s ?p ?o . }"
-        result = self.graph.query(query)
+        predicates = [RDFS.label, SCHEMA.lemma, SCHEMA.gloss, SCHEMA.example]
+        result = [(s, p, o) for p in predicates for s, o in self._get_scope_subject_objects(p)]
         
+        # changes are applied in bulk
+        self._begin_batch()
         for s, p, lexical in result:
             new_lexical = self._format_lexical(lexical.toPython(), True)
             new_lexical = self._new_lexical_literal(new_lexical, True)
@@ -480,6 +707,7 @@ class Repair(OWN):
                 count += 1
                 self._drop_triple((s, p, lexical), name)
                 self._add_triple((s, p, new_lexical), name)
+        self._commit_batch()
 
         # how many actions
         return count
@@ -489,12 +717,17 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?w WHERE{ { ?s owns:word ?w } UNION { ?w owns:lemma ?l } . FILTER NOT EXISTS { ?w rdf:type ?t .} }"
-        result = self.graph.query(query)
+        # words of senses or with lemma
+        words = [word for _, word in self._get_scope_subject_objects(SCHEMA.word)]
+        words += [word for word, _ in self._get_scope_subject_objects(SCHEMA.lemma)]
+        result = [word for word in dict.fromkeys(words) if not self._is_typed(word)]
         
-        for word, in result:
+        # changes are applied in bulk
+        self._begin_batch()
+        for word in result:
             count += 1
             self._add_triple((word, RDF.type, SCHEMA.Word), name)
+        self._commit_batch()
 
         # how many actions
         return count
@@ -504,12 +737,17 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?s WHERE{ { ?ss owns:containsWordSense ?s . } UNION { ?s owns:word ?w } FILTER NOT EXISTS { ?s rdf:type ?t .} }"
-        result = self.graph.query(query)
+        # senses of synsets or with word
+        senses = [sense for _, sense in self._get_scope_subject_objects(SCHEMA.containsWordSense)]
+        senses += [sense for sense, _ in self._get_scope_subject_objects(SCHEMA.word)]
+        result = [sense for sense in dict.fromkeys(senses) if not self._is_typed(sense)]
         
-        for sense, in result:
+        # changes are applied in bulk
+        self._begin_batch()
+        for sense in result:
             count += 1
             self._add_triple((sense, RDF.type, SCHEMA.WordSense), name)
+        self._commit_batch()
 
         # how many actions
         return count
@@ -519,8 +757,11 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?s ?sl ?wl WHERE{ ?s rdfs:label ?sl . ?s owns:word ?w . ?w owns:lemma ?wl . FILTER ( ?sl != ?wl )}"
-        result = self.graph.query(query)
+        result = (
+            (sense, label, lexical) for sense, word in self._get_scope_subject_objects(SCHEMA.word)
+                for label in self.graph.objects(sense, RDFS.label)
+                    for lexical in self.graph.objects(word, SCHEMA.lemma)
+                        if label != lexical)
         
         for sense, label, lexical in result:
             count += 1
@@ -534,14 +775,17 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?s WHERE{ ?ss owns:containsWordSense ?s . FILTER NOT EXISTS { ?s owns:wordNumber ?n .} }"
-        result = self.graph.query(query)
+        senses = dict.fromkeys(sense for _, sense in self._get_scope_subject_objects(SCHEMA.containsWordSense))
+        result = [sense for sense in senses if (sense, SCHEMA.wordNumber, None) not in self.graph]
         
-        for sense, in result:
+        # changes are applied in bulk
+        self._begin_batch()
+        for sense in result:
             count += 1
             word_number = sense.split("-")[-1]
             word_number = Literal(word_number)
             self._add_triple((sense, SCHEMA.wordNumber, word_number), name)
+        self._commit_batch()
 
         # how many actions
         return count
@@ -552,13 +796,19 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?s ?l WHERE{ ?s rdf:type owns:WordSense . ?s owns:word ?w . ?w owns:lemma ?l . FILTER NOT EXISTS { ?s rdfs:label ?l .} }"
-        result = self.graph.query(query)
+        result = (
+            (sense, label) for sense in self._get_scope_nodes(SCHEMA.WordSense)
+                for word in self.graph.objects(sense, SCHEMA.word)
+                    for label in self.graph.objects(word, SCHEMA.lemma)
+                        if not self._has_triple((sense, RDFS.label, label)))
         
+        # changes are applied in bulk
+        self._begin_batch()
         for sense, label in result:
             count += 1
             label = self._new_lexical_literal(label.toPython(), False)
             self._add_triple((sense, RDFS.label, label), name)
+        self._commit_batch()
 
         # how many actions
         return count
@@ -568,8 +818,10 @@ class Repair(OWN):
         """"""
         count = 0
 
-        query = "SELECT ?s ?l WHERE{ ?s rdf:type owns:WordSense . ?s rdfs:label ?l . FILTER NOT EXISTS { ?s owns:word ?w . } }"
-        result = self.graph.query(query)
+        result = (
+            (sense, label) for sense in self._get_scope_nodes(SCHEMA.WordSense)
+                for label in self.graph.objects(sense, RDFS.label)
+                    if (sense, SCHEMA.word, None) not in self.graph)
         
         for sense, label in result:
             count += 1
@@ -585,12 +837,16 @@ class Repair(OWN):
         """"""
         count = 0
         
-        query = "SELECT ?w WHERE{ ?w rdf:type owns:Word . FILTER NOT EXISTS { ?w owns:lemma ?l .} }"
-        result = self.graph.query(query)
+        result = (
+            word for word in self._get_scope_nodes(SCHEMA.Word)
+                if (word, SCHEMA.lemma, None) not in self.graph)
         
+        # changes are applied in bulk
+        self._begin_batch()
         for word in result:
             count += 1
             self._drop_node(word, name)
+        self._commit_batch()
 
         # how many actions
         return count
@@ -600,12 +856,14 @@ class Repair(OWN):
         """"""
         count = 0
         
-        query = "SELECT ?w WHERE { ?w rdf:type owns:Word . FILTER ( isBlank(?w) ) }"
-        result = self.graph.query(query)
+        result = (word for word in self._get_scope_nodes(SCHEMA.Word) if isinstance(word, BNode))
 
-        for word, in result:
+        # changes are applied in bulk
+        self._begin_batch()
+        for word in result:
             count += 1
             self._drop_node(word, name)
+        self._commit_batch()
 
         # how many actions
         return count
@@ -615,8 +873,9 @@ class Repair(OWN):
         """"""
         count = 0
         
-        query = "SELECT ?ss ?s WHERE { ?ss owns:containsWordSense ?s . FILTER ( isBlank(?s) ) }"
-        result = self.graph.query(query)
+        result = (
+            (synset, sense) for synset, sense in self._get_scope_subject_objects(SCHEMA.containsWordSense)
+                if isinstance(sense, BNode))
 
         for synset, sense in result:
             count += 1
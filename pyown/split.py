@@ -56,4 +56,6 @@ class Split(OWN):
             for triple in self.graph.query(query):
                 graph._add_triple(triple)
                 self.graph.remove(triple)
+        # triples were removed behind the index
+        self._invalidate_node_index()
         return graph.graph
\ No newline at end of file
@@ -1,122 +1,119 @@
 # -*- coding: utf-8 -*-
 
-from pyown.own import OWN, SCHEMA
+from collections import Counter
+from pyown.own import OWN, SCHEMA, RDF, Literal
 
-class Statistics(OWN):
-
-    def get_base_core(self, prefix="statistics"):
-        # Base and Core
-        self.logger.debug(f"{prefix}:getting statistics for types CoreConcept and BaseConcept")
-        
-        query = "SELECT (COUNT( DISTINCT ?ss ) AS ?count) WHERE { ?ss a owns:CoreConcept ; owns:containsWordSense ?s . }"
-        own_core = self.graph.query(query).bindings[0]["count"].toPython()
-        query = "SELECT (COUNT( DISTINCT ?ss ) AS ?count) WHERE { ?ss a owns:BaseConcept ; owns:containsWordSense ?s . }"
-        own_base = self.graph.query(query).bindings[0]["count"].toPython()
-
-        return own_base, own_core
+# synset types, as reported
+SYNSET_TYPES = ["NounSynset", "VerbSynset", "AdverbSynset", "AdjectiveSynset", "AdjectiveSatelliteSynset"]
+# word pos, as reported
+WORD_POS = {"Noun":"n", "Verb":"v", "Adverb":"r", "Adjective":"a"}
 
+class Statistics(OWN):
 
-    def get_defined(self, prefix="statistics"):
+    def get_statistics(self, prefix="statistics"):
         """"""
-        self.logger.debug(f"{prefix}:getting statistics for Instantiated Synsets")
+        self.logger.debug(f"{prefix}:getting statistics in a single pass")
+
+        # types of interest
+        typed = {SCHEMA[name]:set() for name in SYNSET_TYPES}
+        typed.update({type:set() for type in [SCHEMA.CoreConcept, SCHEMA.BaseConcept, SCHEMA.WordSense, SCHEMA.Word]})
+        pos_names = {Literal(pos):name for name, pos in WORD_POS.items()}
+
+        members = Counter()
+        words_pos = {name:set() for name in WORD_POS}
+        multi_word = set()
+        relations = {pointer:[0, 0] for pointer in self.pointers}
+
+        # one pass over the graph
+        for s, p, o in self.graph:
+            if p == RDF.type:
+                if o in typed:
+                    typed[o].add(s)
+            elif p == SCHEMA.containsWordSense:
+                members[s] += 1
+            elif p == SCHEMA.pos:
+                if o in pos_names:
+                    words_pos[pos_names[o]].add(s)
+            elif p == SCHEMA.lemma:
+                if " " in str(o):
+                    multi_word.add(s)
+            elif p in relations:
+                if "wordsense" in s and "wordsense" in o:
+                    relations[p][0] += 1
+                elif "synset" in s and "synset" in o:
+                    relations[p][1] += 1
+                else:
+                    self.logger.warning(
+                        f"couldn't classify subject {s.n3()} "
+                        f"or object {o.n3()} under relation {p.n3()}")
 
-        # non void senses
         statistics = dict()
-        for ss_type in ["NounSynset", "VerbSynset", "AdverbSynset", "AdjectiveSynset", "AdjectiveSatelliteSynset"]:
-            # non void senses
-            query = "SELECT (COUNT( DISTINCT ?ss ) AS ?count) WHERE { ?ss a owns:"+ss_type+"; owns:containsWordSense ?s . }"
-            statistics[ss_type] = self.graph.query(query).bindings[0]["count"].toPython()
 
-        # global
-        ss_type = "Synset (total)"
-        query = "SELECT (COUNT( DISTINCT ?ss ) AS ?count) WHERE { ?ss owns:containsWordSense ?s . }"
-        statistics[ss_type] = self.graph.query(query).bindings[0]["count"].toPython()
+        # Base and Core
+        statistics["base_core"] = (
+            sum(1 for ss in typed[SCHEMA.BaseConcept] if members[ss] > 0),
+            sum(1 for ss in typed[SCHEMA.CoreConcept] if members[ss] > 0))
+
+        # instantiated synsets and polysemy
+        defined = dict()
+        polysemy = dict()
+        for ss_type in SYNSET_TYPES:
+            counts = [members[ss] for ss in typed[SCHEMA[ss_type]] if members[ss] > 0]
+            defined[ss_type] = len(counts)
+            polysemy[ss_type] = counts.count(1), len(counts) - counts.count(1)
+        counts = list(members.values())
+        defined["Synset (total)"] = len(counts)
+        polysemy["Synset (total)"] = counts.count(1), len(counts) - counts.count(1)
+        statistics["defined"] = defined
+        statistics["polysemy"] = polysemy
+
+        # multi word expressions
+        multi_word_expressions = {name:len(words & multi_word) for name, words in words_pos.items()}
+        multi_word_expressions["Words (total)"] = len(multi_word)
+        statistics["multi_word_expressions"] = multi_word_expressions
+
+        # relations
+        statistics["relations"] = {
+            pointer.replace(SCHEMA, "owns:"):tuple(counts) for pointer, counts in relations.items()}
+
+        # summary
+        statistics["summary"] = len(typed[SCHEMA.WordSense]), len(typed[SCHEMA.Word])
 
         return statistics
 
 
-    def get_polysemy(self, prefix="statistics"):
-        """"""
-        self.logger.debug(f"{prefix}:getting statistics for Polysemy")
-        
-        # non void senses
-        statistics = dict()
-        for ss_type in ["NounSynset", "VerbSynset", "AdverbSynset", "AdjectiveSynset", "AdjectiveSatelliteSynset"]:
-            # polysemy
-            query = "SELECT (COUNT( DISTINCT ?ss ) AS ?count) WHERE { ?ss a owns:"+ss_type+" ; owns:containsWordSense ?s1 ; owns:containsWordSense ?s2 . FILTER( ?s1 != ?s2 ) }"
-            count_gt_1 = self.graph.query(query).bindings[0]["count"].toPython()
-            query = "SELECT (COUNT( DISTINCT ?ss ) AS ?count) WHERE { ?ss a owns:"+ss_type+" ; owns:containsWordSense ?s1 . FILTER NOT EXISTS { ?ss owns:containsWordSense ?s2 . FILTER( ?s1 != ?s2 )}}"
-            count_eq_1 = self.graph.query(query).bindings[0]["count"].toPython()
+    def get_base_core(self, prefix="statistics"):
+        # Base and Core
+        return self._get_statistics(prefix)["base_core"]
 
-            statistics[ss_type] = count_eq_1, count_gt_1
 
-        # global
-        ss_type = "Synset (total)"
-        query = "SELECT (COUNT( DISTINCT ?ss ) AS ?count) WHERE { ?ss owns:containsWordSense ?s1 ; owns:containsWordSense ?s2 . FILTER( ?s1 != ?s2 ) }"
-        count_gt_1 = self.graph.query(query).bindings[0]["count"].toPython()
-        query = "SELECT (COUNT( DISTINCT ?ss ) AS ?count) WHERE { ?ss owns:containsWordSense ?s1 . FILTER NOT EXISTS { ?ss owns:containsWordSense ?s2 . FILTER( ?s1 != ?s2 )}}"
-        count_eq_1 = self.graph.query(query).bindings[0]["count"].toPython()
+    def get_defined(self, prefix="statistics"):
+        """"""
+        return self._get_statistics(prefix)["defined"]
 
-        statistics[ss_type] = count_eq_1, count_gt_1
 
-        # results
-        return statistics
+    def get_polysemy(self, prefix="statistics"):
+        """"""
+        return self._get_statistics(prefix)["polysemy"]
 
 
     def get_multi_word_expressions(self, prefix="statistics"):
         """"""
-        self.logger.debug(f"{prefix}:getting statistics for Multi Word Expressions")
-
-        # non void senses
-        statistics = dict()
-        name_pos_map = {"Noun":"n", "Verb":"v", "Adverb":"r", "Adjective":"a"}
-        for name, pos in name_pos_map.items():
-            # multi word expressions
-            query = "SELECT (COUNT (DISTINCT ?w) as ?count) WHERE { ?w owns:pos \""+pos+"\"; owns:lemma ?l . FILTER REGEX( STR( ?l ), ' ') }"
-            statistics[name] = self.graph.query(query).bindings[0]["count"].toPython()
-
-        # global
-        name = "Words (total)"
-        query = "SELECT (COUNT ( DISTINCT ?w ) as ?count) WHERE { ?w owns:lemma ?l . FILTER REGEX( STR( ?l ), ' ') }"
-        statistics[name] = self.graph.query(query).bindings[0]["count"].toPython()
-        
-        return statistics
+        return self._get_statistics(prefix)["multi_word_expressions"]
 
 
     def get_relations(self, prefix="statistics"):
         """"""
-        self.logger.debug(f"{prefix}:getting statistics for Relations")
+        return self._get_statistics(prefix)["relations"]
 
-        statistics = dict()
-        
-        for pointer in self.pointers:
-            senses_count = 0
-            synsets_count = 0
-            for subject, object in self.graph.subject_objects(pointer):
-                if "wordsense" in subject and "wordsense" in object:
-                    senses_count += 1
-                elif "synset" in subject and "synset" in object:
-                    synsets_count += 1
-                else:
-                    self.logger.warning(
-                        f"couldn't classify subject {subject.n3()} "
-                        f"or object {object.n3()} under relation {pointer.n3()}")
-            # formats
-            name = pointer
-            name = name.replace(SCHEMA, "owns:")
-            statistics[name] = senses_count, synsets_count
-            
-        return statistics
-    
 
     def get_summary(self, prefix="statistics"):
         """"""
-        self.logger.debug(f"{prefix}:getting statistics for Summary")
-
-        # synsets words and senses
-        query = "SELECT (COUNT( DISTINCT ?s ) AS ?count) WHERE { ?s a owns:WordSense . }"
-        senses = self.graph.query(query).bindings[0]["count"]
-        query = "SELECT (COUNT( DISTINCT ?w ) AS ?count) WHERE { ?w a owns:Word . }"
-        words = self.graph.query(query).bindings[0]["count"]
-        
-        return senses, words
+        return self._get_statistics(prefix)["summary"]
+
+
+    def _get_statistics(self, prefix):
+        # computed once by instance
+        if getattr(self, "_statistics", None) is None:
+            self._statistics = self.get_statistics(prefix)
+        return self._statistics
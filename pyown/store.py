@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+from itertools import chain
+from bisect import bisect_left, bisect_right
+from rdflib import plugin
+from rdflib.store import Store
+
+# positions of subject, predicate and object in each index key
+INDEXES = {
+    "spo": (0, 1, 2),
+    "pos": (1, 2, 0),
+    "osp": (2, 0, 1)}
+
+# from index keys back to (subject, predicate, object)
+UNPACK = {
+    "spo": lambda a, b, c: (a, b, c),
+    "pos": lambda a, b, c: (c, a, b),
+    "osp": lambda a, b, c: (b, c, a)}
+
+
+class CompactStore(Store):
+    """In-memory store interning every term to an integer id.
+
+    Triples live in SPO, POS and OSP indexes made of sorted integer arrays.
+    Changes are buffered and merged into the arrays once they grow past
+    `merge_threshold` (or past the size of the arrays themselves).
+    """
+
+    def __init__(self, configuration=None, identifier=None, merge_threshold=1<<16):
+        super().__init__(configuration)
+        self.identifier = identifier
+        self.merge_threshold = merge_threshold
+
+        # namespaces
+        self._namespace = dict()
+        self._prefix = dict()
+
+        # interned terms
+        self._terms = []
+        self._ids = dict()
+
+        # sorted indexes, one array by key position
+        self._indexes = {name:(array("L"), array("L"), array("L")) for name in INDEXES}
+
+        # changes not merged yet
+        self._added = set()
+        self._added_by = (dict(), dict(), dict())
+        self._removed = set()
+
+
+    def add(self, triple, context, quoted=False):
+        Store.add(self, triple, context, quoted)
+
+        triple = tuple(self._intern(term) for term in triple)
+        if triple in self._removed:
+            # triple is back in the indexes
+            self._removed.discard(triple)
+            return
+        if triple in self._added or self._in_indexes(triple):
+            return
+
+        self._added.add(triple)
+        for position, term_id in enumerate(triple):
+            self._added_by[position].setdefault(term_id, set()).add(triple)
+
+        if len(self._added) > max(self.merge_threshold, len(self._indexes["spo"][0])):
+            self._merge()
+
+
+    def remove(self, triple_pattern, context=None):
+        Store.remove(self, triple_pattern, context)
+
+        triple_pattern = self._get_ids(triple_pattern)
+        if triple_pattern is None:
+            return
+
+        for triple in list(self._match(*triple_pattern)):
+            if triple in self._added:
+                self._added.discard(triple)
+                for position, term_id in enumerate(triple):
+                    self._added_by[position][term_id].discard(triple)
+            else:
+                self._removed.add(triple)
+
+        if len(self._removed) > max(self.merge_threshold, len(self._indexes["spo"][0]) // 2):
+            self._merge()
+
+
+    def triples(self, triple_pattern, context=None):
+        triple_pattern = self._get_ids(triple_pattern)
+        if triple_pattern is None:
+            return
+
+        terms = self._terms
+        for s, p, o in self._match(*triple_pattern):
+            yield (terms[s], terms[p], terms[o]), iter(())
+
+
+    def __len__(self, context=None):
+        return len(self._indexes["spo"][0]) - len(self._removed) + len(self._added)
+
+
+    def contexts(self, triple=None):
+        return iter(())
+
+
+    def bind(self, prefix, namespace, override=True):
+        bound_prefix = self._prefix.get(namespace)
+        bound_namespace = self._namespace.get(prefix)
+        if override:
+            if bound_prefix is not None:
+                del self._namespace[bound_prefix]
+            if bound_namespace is not None:
+                del self._prefix[bound_namespace]
+            self._prefix[namespace] = prefix
+            self._namespace[prefix] = namespace
+        else:
+            self._prefix[bound_namespace or namespace] = bound_prefix or prefix
+            self._namespace[bound_prefix or prefix] = bound_namespace or namespace
+
+
+    def namespace(self, prefix):
+        return self._namespace.get(prefix, None)
+
+
+    def prefix(self, namespace):
+        return self._prefix.get(namespace, None)
+
+
+    def namespaces(self):
+        for prefix, namespace in self._namespace.items():
+            yield prefix, namespace
+
+
+    def _intern(self, term):
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = self._ids[term] = len(self._terms)
+            self._terms.append(term)
+        return term_id
+
+
+    def _get_ids(self, triple_pattern):
+        ids = []
+        for term in triple_pattern:
+            if term is None:
+                ids.append(None)
+                continue
+            term_id = self._ids.get(term)
+            # unknown terms never match
+            if term_id is None:
+                return None
+            ids.append(term_id)
+        return ids
+
+
+    def _match(self, s, p, o):
+        # fully bound, membership test
+        if s is not None and p is not None and o is not None:
+            triple = (s, p, o)
+            if triple in self._added or triple not in self._removed and self._in_indexes(triple):
+                return [triple]
+            return []
+
+        # chooses the index where bound terms form a key prefix
+        if s is not None:
+            if p is not None:
+                name, keys = "spo", (s, p)
+            elif o is not None:
+                name, keys = "osp", (o, s)
+            else:
+                name, keys = "spo", (s,)
+        elif p is not None:
+            name, keys = "pos", (p,) if o is None else (p, o)
+        elif o is not None:
+            name, keys = "osp", (o,)
+        else:
+            # full scans are streamed over the current arrays
+            return chain(self._scan(name="spo", keys=(), removed=self._removed), list(self._added))
+
+        # changes not merged, by the first bound term
+        bound = [(position, term_id) for position, term_id in enumerate((s, p, o)) if term_id is not None]
+        position, term_id = bound[0]
+        added = self._added_by[position].get(term_id, ())
+        added = [triple for triple in added if all(triple[i] == k for i, k in bound)]
+
+        return list(chain(self._scan(name, keys, self._removed), added))
+
+
+    def _scan(self, name, keys, removed):
+        columns = self._indexes[name]
+        unpack = UNPACK[name]
+
+        # narrows the range key by key
+        low, high = 0, len(columns[0])
+        for column, key in zip(columns, keys):
+            low = bisect_left(column, key, low, high)
+            high = bisect_right(column, key, low, high)
+
+        a, b, c = columns
+        for i in range(low, high):
+            triple = unpack(a[i], b[i], c[i])
+            if triple not in removed:
+                yield triple
+
+
+    def _in_indexes(self, triple):
+        for _ in self._scan("spo", triple, ()):
+            return True
+        return False
+
+
+    def _merge(self):
+        triples = list(self._scan("spo", (), self._removed))
+        triples.extend(self._added)
+
+        # builds new arrays, so running scans keep their own
+        indexes = dict()
+        for name, (i, j, k) in INDEXES.items():
+            keys = sorted((triple[i], triple[j], triple[k]) for triple in triples)
+            indexes[name] = tuple(array("L", (key[n] for key in keys)) for n in range(3))
+
+        self._indexes = indexes
+        self._added = set()
+        self._added_by = (dict(), dict(), dict())
+        self._removed = set()
+
+
+plugin.register("compact", Store, "pyown.store", "CompactStore")
@@ -3,6 +3,10 @@
 from tqdm import tqdm
 from pyown.own import OWN, RDFS, SCHEMA
 
+# fields read from suggestions and votes documents
+SUGGESTION_FIELDS = ["id", "doc_id", "action", "params", "status", "user", "date"]
+VOTE_FIELDS = ["suggestion_id", "value"]
+
 class Update(OWN):
 
     def update(
@@ -14,7 +18,8 @@ class Update(OWN):
         trashold_junior=2):
         """"""
 
-        votes = [x["_source"] for x in doc_votes]
+        # votes are consumed once, while joining to suggestions
+        votes = (x["_source"] for x in doc_votes)
         suggestions = [x["_source"] for x in doc_suggestions]
         
         self.logger.info("formatting suggestions to apply")
@@ -35,6 +40,10 @@ class Update(OWN):
         # statistics
         self.logger.info(f"total triples added by action: {self.added_triples}")
         self.logger.info(f"total triples removed by action: {self.removed_triples}")
+        for prefix in sorted(self.added_by_prefix.keys() | self.removed_by_prefix.keys()):
+            self.logger.debug(
+                f"{prefix}: {self.added_by_prefix[prefix]} triples added, "
+                f"{self.removed_by_prefix[prefix]} triples removed")
 
 
     def update_from_compare(self, report):
@@ -60,7 +69,8 @@ class Update(OWN):
         """"""
         
         for suggestion in tqdm(suggestions):
-            self._apply_suggestion(suggestion)
+            with self._measure(suggestion["action"]) as measure:
+                measure["rows"] = int(self._apply_suggestion(suggestion))
 
 
     def _apply_suggestion(self, suggestion):
@@ -137,6 +147,8 @@ class Update(OWN):
             term = "already" if action.startswith("add") else "not"
             self.logger.debug(f"{action}: param '{params}' {term} in '{synset.n3()}'")
 
+        return result
+
 
     def _filter_suggestions(
         self,
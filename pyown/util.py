@@ -1,6 +1,26 @@
 # -*- coding: utf-8 -*-
 
+import os
+import gzip
+import lzma
+from time import perf_counter
+from logging import getLogger
+from concurrent.futures import ProcessPoolExecutor
+from rdflib import Graph, OWL
 from rdflib.util import guess_format
+import pyown.store # registers the "compact" store
+from pyown.own import PWN30
+from pyown.cache import load_snapshot, save_snapshot, load_ili_snapshot, save_ili_snapshot, encode_triples, decode_triples
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+logger = getLogger("own")
+
+# formats whose parsers add triples one by one, through Graph.add
+SINK_FORMATS = {"nt", "nt11", "ntriples", "ttl", "turtle", "xml"}
 
 def get_format(filepath:str):
     """"""
@@ -8,6 +28,157 @@ def get_format(filepath:str):
     filepath_format = guess_format(filepath, {"jsonld":"json-ld"})    
     return filepath_format if filepath_format else filepath.split(".")[-1]
 
+def open_output(filepath:str):
+    """"""
+
+    # compressed by extension, with no timestamp so outputs are reproducible
+    if filepath.endswith(".gz"):
+        return gzip.GzipFile(filepath, "wb", mtime=0)
+    if filepath.endswith(".xz"):
+        return lzma.open(filepath, "wb")
+    return open(filepath, "wb")
+
+def open_input(filepath:str):
+    """"""
+
+    # compressed by extension
+    if filepath.endswith(".gz"):
+        return gzip.open(filepath, "rb")
+    if filepath.endswith(".xz"):
+        return lzma.open(filepath, "rb")
+    return open(filepath, "rb")
+
+def load_graphs(filepaths:list, cache_dir=None, processes=None, store="default"):
+    """"""
+
+    # reuses a previous parsing if inputs did not change
+    if cache_dir:
+        graph = load_snapshot(filepaths, cache_dir, store)
+        if graph is not None:
+            return graph
+
+    # parses files in parallel, merging them in the given order
+    graph = Graph(store=store)
+    snapshot_triples = []
+    for filepath, triples, namespaces, elapsed in _parse_files(filepaths, processes):
+        logger.info(f"loaded {len(triples)} triples from file '{filepath}' in {elapsed:.2f}s")
+        for prefix, namespace in namespaces:
+            graph.bind(prefix, namespace, override=False)
+        graph.addN((s, p, o, graph) for s, p, o in triples)
+        if cache_dir:
+            snapshot_triples.extend(triples)
+
+    if cache_dir:
+        save_snapshot(snapshot_triples, list(graph.namespaces()), filepaths, cache_dir)
+
+    return graph
+
+def load_ili_map(filepath:str, cache_dir=None):
+    """"""
+
+    # reuses a previous parsing if the map did not change
+    if cache_dir:
+        ili_map = load_ili_snapshot(filepath, cache_dir)
+        if ili_map is not None:
+            return ili_map
+
+    start = perf_counter()
+    graph = Graph()
+    graph.parse(filepath, format=get_format(filepath))
+    ili_map = get_ili_map(graph)
+    logger.info(f"loaded {len(ili_map)} ili mappings from file '{filepath}' in {perf_counter()-start:.2f}s")
+
+    if cache_dir:
+        save_ili_snapshot(ili_map, filepath, cache_dir)
+
+    return ili_map
+
+def get_ili_map(graph:Graph):
+    """"""
+
+    # from pwn30 synset id to ili id, first mapping wins (as graph.value)
+    ili_map = dict()
+    for ili, _, synset in graph.triples((None, OWL.sameAs, None)):
+        if synset.startswith(PWN30):
+            ili_map.setdefault(str(synset)[len(PWN30):], ili.split("/")[-1])
+
+    # satellites are also found by their adjective id
+    for synset_id, ili in list(ili_map.items()):
+        if synset_id.endswith("-s"):
+            ili_map.setdefault(synset_id[:-1] + "a", ili)
+
+    return ili_map
+
+def parse_triples(filepath:str):
+    """"""
+
+    # other parsers write to the store, not through Graph.add
+    format = get_format(filepath)
+    if format not in SINK_FORMATS:
+        graph = Graph()
+        graph.parse(filepath, format=format)
+        return list(graph), list(graph.namespaces())
+
+    sink = _TriplesSink()
+    sink.parse(filepath, format=format)
+    return sink.triples, list(sink.namespaces())
+
+def _parse_files(filepaths:list, processes=None):
+    processes = min(processes or os.cpu_count() or 1, len(filepaths))
+
+    # small jobs are not worth spawning processes
+    if processes <= 1:
+        for filepath in filepaths:
+            logger.info(f"loading data from file '{filepath}'")
+            start = perf_counter()
+            triples, namespaces = parse_triples(filepath)
+            yield filepath, triples, namespaces, perf_counter() - start
+        return
+
+    logger.info(f"loading data from {len(filepaths)} files with {processes} processes")
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for filepath, (terms, encoded, namespaces, elapsed) in zip(filepaths,
+                executor.map(_parse_encoded_triples, filepaths)):
+            triples = list(decode_triples(terms, encoded))
+            yield filepath, triples, namespaces, elapsed
+
+def _parse_encoded_triples(filepath:str):
+    start = perf_counter()
+    triples, namespaces = parse_triples(filepath)
+    elapsed = perf_counter() - start
+    # interned terms are much cheaper to send back
+    terms, encoded = encode_triples(triples)
+    return terms, encoded, namespaces, elapsed
+
+class _TriplesSink(Graph):
+    """Graph that only records parsed triples, keeping the parsing order."""
+
+    def __init__(self):
+        super().__init__()
+        self.triples = []
+
+    def add(self, triple):
+        self.triples.append(triple)
+        return self
+
+def read_jsonl(filepaths:list, fields=None, batch_size=1<<20):
+    """"""
+
+    for filepath in filepaths:
+        logger.info(f"loading data from '{filepath}'")
+        with open(filepath, "rb") as jsonl_file:
+            # decodes about batch_size bytes of lines at a time
+            for lines in iter(lambda: jsonl_file.readlines(batch_size), []):
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    doc = loads(line)
+                    # keeps only the fields that will be read
+                    if fields is not None:
+                        source = doc["_source"]
+                        doc = {"_source": {field:source[field] for field in fields if field in source}}
+                    yield doc
+
 def get_unify_actions(report:dict):
     for doc, doc_report in report.copy().items():
         if doc_report["compare"]:
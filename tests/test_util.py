@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from rdflib import Graph, ConjunctiveGraph, Literal, BNode, RDF, RDFS
+from rdflib.compare import isomorphic
+from pyown.own import SCHEMA, INSTANCE_PT
+from pyown.util import get_format, parse_triples, load_graphs
+
+# extensions read by get_format, as rdflib parser names
+EXTENSIONS = ["nt", "nt11", "ttl", "turtle", "n3", "xml", "jsonld", "json-ld", "trig", "nquads", "trix"]
+# extensions serialized from a dataset
+QUAD_EXTENSIONS = {"trig", "nquads", "trix"}
+
+
+def _get_graph():
+    graph = Graph()
+    graph.bind("owns", SCHEMA)
+    for i in range(20):
+        synset = INSTANCE_PT[f"synset-{i:08d}-n"]
+        sense = INSTANCE_PT[f"wordsense-{i:08d}-n-1"]
+        graph.add((synset, RDF.type, SCHEMA.NounSynset))
+        graph.add((synset, SCHEMA.containsWordSense, sense))
+        graph.add((synset, SCHEMA.gloss, Literal(f"glosa {i}", lang="pt")))
+        graph.add((sense, RDFS.label, Literal(f"lema {i}", lang="pt")))
+        word = BNode()
+        graph.add((sense, SCHEMA.word, word))
+        graph.add((word, SCHEMA.lemma, Literal(f"lema {i}", lang="pt")))
+    return graph
+
+
+class TestLoadGraphs(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.graph = _get_graph()
+        self.filepaths = dict()
+        for extension in EXTENSIONS:
+            filepath = os.path.join(self.tmpdir.name, f"own.{extension}")
+            if extension in QUAD_EXTENSIONS:
+                dataset = ConjunctiveGraph()
+                dataset.get_context(INSTANCE_PT["graph"]).addN(
+                    (s, p, o, dataset.get_context(INSTANCE_PT["graph"])) for s, p, o in self.graph)
+                dataset.serialize(filepath, format=get_format(filepath))
+            else:
+                self.graph.serialize(filepath, format=get_format(filepath))
+            self.filepaths[extension] = filepath
+
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+    def _parse(self, filepath):
+        graph = Graph()
+        graph.parse(filepath, format=get_format(filepath))
+        return graph
+
+
+    def test_parse_triples(self):
+        for extension, filepath in self.filepaths.items():
+            with self.subTest(extension=extension):
+                expected = self._parse(filepath)
+                triples, _ = parse_triples(filepath)
+                graph = Graph()
+                graph.addN((s, p, o, graph) for s, p, o in triples)
+                self.assertEqual(len(triples), len(expected))
+                self.assertTrue(isomorphic(graph, expected))
+
+
+    def test_load_graphs(self):
+        filepaths = list(self.filepaths.values())
+        expected = Graph()
+        for filepath in filepaths:
+            expected += self._parse(filepath)
+
+        # serially, in parallel and from a snapshot
+        cache_dir = os.path.join(self.tmpdir.name, "cache")
+        for processes, cache in [(1, None), (2, None), (2, cache_dir), (1, cache_dir)]:
+            with self.subTest(processes=processes, cache=cache):
+                graph = load_graphs(filepaths, cache, processes)
+                self.assertEqual(len(graph), len(expected))
+                self.assertTrue(isomorphic(graph, expected))
+
+
+if __name__ == "__main__":
+    unittest.main()